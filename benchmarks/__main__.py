@@ -0,0 +1,40 @@
+# python -m benchmarks [run] [--quick] [--seconds S] [--match TEXT] [--output FILE]
+# python -m benchmarks compare BASE.json HEAD.json [--threshold 0.1]
+import argparse
+import sys
+
+from .suite import compare, run, save
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--quick", action="store_true", help="smaller inputs")
+    run_parser.add_argument("--seconds", type=float, default=0.2, help="per case")
+    run_parser.add_argument("--match", help="only cases containing this text")
+    run_parser.add_argument("--output", help="save results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two saved runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        slower = compare(args.base, args.head, args.threshold)
+        return 1 if slower else 0
+
+    report = run(
+        getattr(args, "seconds", 0.2),
+        getattr(args, "quick", False),
+        getattr(args, "match", None),
+    )
+    if getattr(args, "output", None):
+        save(report, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
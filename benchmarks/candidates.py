@@ -0,0 +1,37 @@
+# Trickle ICE: candidates/sec through parseCandidate/writeCandidate against
+# wrapping each candidate in a minimal SDP for parse()/write().
+#
+#   python -m benchmarks.candidates [count]
+import sys
+
+from sdp_transform import parse, parseCandidate, write, writeCandidate
+
+from .suite import rate
+
+CANDIDATES = [
+    "candidate:0 1 UDP 2113667327 203.0.113.1 54400 typ host",
+    "candidate:1162875081 1 udp 2113937151 192.168.34.75 60017 typ host "
+    "generation 0 ufrag EsAw network-id 3 network-cost 10",
+    "candidate:3289912957 2 udp 1845501695 193.84.77.194 60017 typ srflx "
+    "raddr 192.168.34.75 rport 60017 generation 0 network-id 3 network-cost 10",
+    "candidate:229815620 1 tcp 1518280447 192.168.150.19 60017 typ host "
+    "tcptype active generation 0 network-id 3 network-cost 10",
+]
+HEAD = "v=0\r\no=- 1 1 IN IP4 0.0.0.0\r\ns=-\r\nt=0 0\r\nm=audio 9 UDP 0\r\na="
+
+
+def main(count=100000):
+    parsed = [parseCandidate(c) for c in CANDIDATES]
+    sessions = [parse(HEAD + c + "\r\n") for c in CANDIDATES]
+    rows = [
+        ("parse(sdp)", rate(parse, [HEAD + c + "\r\n" for c in CANDIDATES], count)),
+        ("parseCandidate", rate(parseCandidate, CANDIDATES, count)),
+        ("write(session)", rate(write, sessions, count)),
+        ("writeCandidate", rate(writeCandidate, parsed, count)),
+    ]
+    for name, value in rows:
+        print("%-16s %10.0f candidates/sec" % (name, value))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
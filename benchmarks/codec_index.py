@@ -0,0 +1,51 @@
+# payload type lookups on a video section with many payload types and
+# rtcp-fb lines: scanning the rtp, fmtp and rtcpFb lists against
+# mediaCodecs().
+#
+#   python -m benchmarks.codec_index [payloads] [count]
+import sys
+
+from sdp_transform import mediaCodecs, parse
+
+from .suite import rate
+
+
+def make_video(payloads):
+    lines = [
+        "v=0",
+        "o=- 1 1 IN IP4 127.0.0.1",
+        "s=-",
+        "t=0 0",
+        "m=video 9 UDP/TLS/RTP/SAVPF %s"
+        % " ".join(str(96 + i) for i in range(payloads)),
+    ]
+    for i in range(payloads):
+        payload = 96 + i
+        lines.append("a=rtpmap:%d VP8/90000" % payload)
+        for fb in ("goog-remb", "transport-cc", "ccm fir", "nack", "nack pli"):
+            lines.append("a=rtcp-fb:%d %s" % (payload, fb))
+        lines.append("a=fmtp:%d max-fs=12288;max-fr=60" % payload)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def scan(media, payload):
+    rtp = next((e for e in media["rtp"] if e["payload"] == payload), None)
+    fmtp = next((e for e in media["fmtp"] if e["payload"] == payload), None)
+    fb = [e for e in media["rtcpFb"] if e["payload"] in (payload, "*")]
+    return rtp, fmtp, fb
+
+
+def main(payloads=40, count=20000):
+    media = parse(make_video(payloads))["media"][0]
+    codecs = mediaCodecs(media)
+    wanted = [96 + i for i in range(payloads)]
+    rows = [
+        ("payload -> codec, scan", lambda payload: scan(media, payload)),
+        ("payload -> codec, index", lambda payload: codecs[payload]),
+    ]
+    for name, fn in rows:
+        print("%-24s %12.0f lookups/sec" % (name, rate(fn, wanted, count)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,42 @@
+# Compares the memory held by parsed sessions with and without compact=True,
+# keeping a number of live copies of every SDP in tests/sdps.
+#
+#   python -m benchmarks.compact_memory [copies]
+import sys
+import tracemalloc
+
+from sdp_transform import parse
+
+from .suite import load_corpus
+
+
+def held(sdp, copies, compact):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [parse(sdp, compact=compact) for _ in range(copies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / copies
+
+
+def main(copies=200):
+    totals = [0, 0]
+    print("%-28s %10s %10s %7s" % ("sdp", "dict", "compact", "saved"))
+    for filename, sdp in load_corpus().items():
+        plain = held(sdp, copies, False)
+        compact = held(sdp, copies, True)
+        totals[0] += plain
+        totals[1] += compact
+        print(
+            "%-28s %10.0f %10.0f %6.1f%%"
+            % (filename, plain, compact, 100 * (1 - compact / plain))
+        )
+    print(
+        "%-28s %10.0f %10.0f %6.1f%%"
+        % ("total (bytes/session)", totals[0], totals[1], 100 * (1 - totals[1] / totals[0]))
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
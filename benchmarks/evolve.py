@@ -0,0 +1,37 @@
+# Changing one attribute of a retained session and writing it: deepcopy +
+# change + write (what callers did while write() mutated its input) against
+# writing the shared session directly, and evolve()/replace() on a frozen one.
+#
+#   python -m benchmarks.evolve [media] [count]
+import sys
+from copy import deepcopy
+
+from sdp_transform import freeze, parse, replace, write
+
+from .generate import make_sdp
+from .suite import rate
+
+
+def main(media=10, count=300):
+    session = parse(make_sdp(media=media, candidates=4, ssrcs=2))
+    frozen = freeze(session)
+    path = ("media", media - 1, "direction")
+
+    def copied(session):
+        copy = deepcopy(session)
+        copy["media"][-1]["direction"] = "recvonly"
+        return copy
+
+    rows = [
+        ("deepcopy + change", copied, session),
+        ("replace (frozen)", lambda f: replace(f, path, "recvonly"), frozen),
+        ("write(deepcopy)", lambda s: write(deepcopy(s)), session),
+        ("write(session)", write, session),
+        ("replace + write", lambda f: write(replace(f, path, "recvonly")), frozen),
+    ]
+    for name, fn, value in rows:
+        print("%-20s %10.0f /sec" % (name, rate(fn, [value], count)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
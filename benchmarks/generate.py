@@ -0,0 +1,73 @@
+# Synthetic SDPs for the benchmark suite: a WebRTC-style offer with any number
+# of m-sections, each carrying the given number of candidates and ssrcs
+# (paired into FID groups with fid=True).
+
+
+def make_media(index, candidates, ssrcs, fid=False):
+    kind = "audio" if index % 2 == 0 else "video"
+    lines = []
+    if kind == "audio":
+        lines += [
+            "m=audio 9 UDP/TLS/RTP/SAVPF 111 0",
+            "c=IN IP4 0.0.0.0",
+            "a=rtcp:9 IN IP4 0.0.0.0",
+            "a=rtpmap:111 opus/48000/2",
+            "a=fmtp:111 minptime=10;useinbandfec=1",
+            "a=rtpmap:0 PCMU/8000",
+            "a=rtcp-fb:111 transport-cc",
+        ]
+    else:
+        lines += [
+            "m=video 9 UDP/TLS/RTP/SAVPF 96 97",
+            "c=IN IP4 0.0.0.0",
+            "a=rtcp:9 IN IP4 0.0.0.0",
+            "a=rtpmap:96 H264/90000",
+            "a=fmtp:96 level-asymmetry-allowed=1;packetization-mode=1;"
+            "profile-level-id=42e01f",
+            "a=rtpmap:97 rtx/90000",
+            "a=fmtp:97 apt=96",
+            "a=rtcp-fb:96 nack",
+            "a=rtcp-fb:96 nack pli",
+            "a=rtcp-fb:96 goog-remb",
+            "a=imageattr:96 send [x=1280,y=720] recv [x=1280,y=720] [x=320,y=180]",
+            "a=rid:h send pt=96;max-width=1280;max-height=720",
+            "a=simulcast:send h;~l",
+        ]
+    lines += [
+        "a=ice-ufrag:F7gI",
+        "a=ice-pwd:x9cml/YzichV2+XlhiMu8g",
+        "a=fingerprint:sha-256 42:89:C5:C6:55:9D:6E:C8:E8:83:55:2A:39:F9:B6:EB:"
+        "E9:A3:A9:E7:42:89:C5:C6:55:9D:6E:C8:E8:83:55:2A",
+        "a=setup:actpass",
+        "a=mid:%d" % index,
+        "a=extmap:1 urn:ietf:params:rtp-hdrext:sdes:mid",
+        "a=sendrecv",
+        "a=rtcp-mux",
+    ]
+    for i in range(candidates):
+        lines.append(
+            "a=candidate:%d %d udp %d 192.0.2.%d %d typ host generation 0 "
+            "network-id 1 network-cost 10"
+            % (i, 1 + i % 2, 2122260223 - i, i % 250, 50000 + i % 10000)
+        )
+    for i in range(ssrcs):
+        ssrc = 100000 * (index + 1) + i
+        if fid and i % 2 == 0 and i + 1 < ssrcs:
+            lines.append("a=ssrc-group:FID %d %d" % (ssrc, ssrc + 1))
+        lines.append("a=ssrc:%d cname:stream%d" % (ssrc, i))
+        lines.append("a=ssrc:%d msid:stream%d track%d" % (ssrc, i, i))
+    return lines
+
+
+def make_sdp(media=1, candidates=0, ssrcs=0, fid=False):
+    lines = [
+        "v=0",
+        "o=- 4611731400430051336 2 IN IP4 127.0.0.1",
+        "s=-",
+        "t=0 0",
+        "a=group:BUNDLE " + " ".join(str(i) for i in range(media)),
+        "a=msid-semantic: WMS",
+    ]
+    for index in range(media):
+        lines += make_media(index, candidates, ssrcs, fid)
+    return "\r\n".join(lines) + "\r\n"
@@ -0,0 +1,35 @@
+# Parse once, then repeatedly change one field and write the session again,
+# with a plain dict and with a tracked session from parseEditable().
+#
+#   python -m benchmarks.incremental_write [writes]
+import sys
+import time
+
+from sdp_transform import parse, parseEditable, write
+
+from .suite import load_corpus
+
+
+def run(session, writes):
+    start = time.perf_counter()
+    for i in range(writes):
+        session["media"][0]["iceUfrag"] = "ufrag%d" % i
+        write(session)
+    return time.perf_counter() - start
+
+
+def main(writes=1000):
+    print("%-28s %12s %12s %8s" % ("sdp", "dict (ms)", "tracked (ms)", "speedup"))
+    for filename, sdp in load_corpus().items():
+        if not parse(sdp)["media"]:
+            continue
+        plain = min(run(parse(sdp), writes) for _ in range(3))
+        tracked = min(run(parseEditable(sdp), writes) for _ in range(3))
+        print(
+            "%-28s %12.1f %12.1f %7.1fx"
+            % (filename, plain * 1000, tracked * 1000, plain / tracked)
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
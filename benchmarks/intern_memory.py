@@ -0,0 +1,50 @@
+# Memory held by parsed sessions with and without interning the grammar's
+# "intern" values, keeping a number of live copies of every SDP in tests/sdps
+# plus generated ones (codec, candidate and ssrc heavy).
+#
+#   python -m benchmarks.intern_memory [copies]
+import sys
+import tracemalloc
+
+from sdp_transform import parse
+
+from .generate import make_sdp
+from .suite import load_corpus
+
+
+def held(sdp, copies, intern):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [parse(sdp, intern=intern) for _ in range(copies)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / copies
+
+
+def main(copies=200):
+    totals = [0, 0]
+    print("%-28s %10s %10s %7s" % ("sdp", "plain", "interned", "saved"))
+    corpus = load_corpus()
+    corpus["generated (10 media)"] = make_sdp(media=10, candidates=4, ssrcs=2)
+    for filename, sdp in corpus.items():
+        plain = held(sdp, copies, False)
+        interned = held(sdp, copies, True)
+        totals[0] += plain
+        totals[1] += interned
+        print(
+            "%-28s %10.0f %10.0f %6.1f%%"
+            % (filename, plain, interned, 100 * (1 - interned / plain))
+        )
+    print(
+        "%-28s %10.0f %10.0f %6.1f%%"
+        % ("total (bytes/session)", *totals, 100 * (1 - totals[1] / totals[0]))
+    )
+    print(
+        "%d sessions of each: %.1f MB saved"
+        % (copies, (totals[0] - totals[1]) * copies / 1e6)
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
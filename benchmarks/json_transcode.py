@@ -0,0 +1,61 @@
+# toJson(sdp) against json.dumps(parse(sdp)), and fromJson(text) against
+# write(json.loads(text)), over tests/sdps and generated SDPs.
+#
+#   python -m benchmarks.json_transcode [count]
+import json
+import sys
+import time
+import tracemalloc
+
+from sdp_transform import fromJson, parse, toJson, write
+
+from .generate import make_sdp
+from .suite import load_corpus, rate
+
+
+def peak(fn, item):
+    tracemalloc.start()
+    fn(item)
+    size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size
+
+
+def main(count=200, rounds=7):
+    # the two variants of a row take turns, best round of each is kept
+    inputs = [
+        ("tests/sdps", list(load_corpus().values()), count * 10),
+        ("media-10", [make_sdp(media=10, candidates=4, ssrcs=2)], count),
+        ("candidates-1000", [make_sdp(media=1, candidates=1000)], max(1, count // 10)),
+    ]
+    print(
+        "%-16s %-8s %12s %12s %8s %12s %12s"
+        % ("input", "", "dict/sec", "direct/sec", "speedup", "dict peak", "direct peak")
+    )
+    for label, sdps, n in inputs:
+        texts = [json.dumps(parse(sdp)) for sdp in sdps]
+        rows = [
+            ("toJson", lambda sdp: json.dumps(parse(sdp)), toJson, sdps),
+            ("fromJson", lambda text: write(json.loads(text)), fromJson, texts),
+        ]
+        for name, old, new, items in rows:
+            before = after = 0
+            for _ in range(rounds):
+                before = max(before, rate(old, items, n, time.process_time))
+                after = max(after, rate(new, items, n, time.process_time))
+            print(
+                "%-16s %-8s %12.0f %12.0f %7.2fx %12d %12d"
+                % (
+                    label,
+                    name,
+                    before,
+                    after,
+                    after / before,
+                    peak(old, items[-1]),
+                    peak(new, items[-1]),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,53 @@
+# mid lookups on a BUNDLE offer with many m-sections: a linear scan over
+# session["media"] and the groups' mids strings against sessionMids().
+#
+#   python -m benchmarks.mid_index [media] [count]
+import sys
+import time
+
+from sdp_transform import parse, parseIndexed
+
+from .generate import make_sdp
+from .suite import rate
+
+
+def scan_media(session, mid):
+    for media in session["media"]:
+        if media.get("mid") == mid:
+            return media
+    return None
+
+
+def scan_group(session, mid):
+    for group in session.get("groups", []):
+        if str(mid) in group["mids"].split():
+            return group
+    return None
+
+
+def main(media=500, count=20000):
+    sdp = make_sdp(media=media)
+    start = time.perf_counter()
+    for _ in range(5):
+        parse(sdp)
+    plain = (time.perf_counter() - start) / 5
+    start = time.perf_counter()
+    for _ in range(5):
+        session, mids = parseIndexed(sdp)
+    indexed = (time.perf_counter() - start) / 5
+    print("parse %.1f ms, parseIndexed %.1f ms" % (plain * 1e3, indexed * 1e3))
+
+    wanted = list(range(media))
+    rows = [
+        ("mid -> media, scan", lambda mid: scan_media(session, mid)),
+        ("mid -> media, index", lambda mid: mids.get(mid)),
+        ("mid -> group, scan", lambda mid: scan_group(session, mid)),
+        ("mid -> group, index", lambda mid: mids.group(mid)),
+        ("bundle owner, index", lambda mid: mids.bundleOwner(mid)),
+    ]
+    for name, fn in rows:
+        print("%-22s %12.0f lookups/sec" % (name, rate(fn, wanted, count)))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,65 @@
+# parseParams/parseImageAttributes and toIntIfInt against the previous
+# implementations (re.split per call, try/except numeric conversion), over the
+# fmtp configs, rid params and imageattrs of tests/sdps.
+#
+#   python -m benchmarks.params [count]
+import re
+import sys
+from functools import reduce
+
+from sdp_transform import parse, parseImageAttributes, parseParams
+from sdp_transform.parser import convertNumber, toIntIfInt
+
+from .suite import attribute_values, load_corpus, rate
+
+
+def old_reducer(acc, expr):
+    s = expr.split("=", 1)
+    if len(s) == 2:
+        acc[s[0]] = convertNumber(s[1])
+    elif len(s) == 1 and len(expr) > 1:
+        acc[s[0]] = None
+    return acc
+
+
+def old_parse_params(string):
+    return reduce(old_reducer, re.split(r";\s?", string), {})
+
+
+def old_parse_image_attributes(string):
+    return [
+        reduce(old_reducer, item[1:-1].split(","), {}) for item in string.split(" ")
+    ]
+
+
+def main(count=200000):
+    sessions = [parse(sdp) for sdp in load_corpus().values()]
+    params = attribute_values(sessions, "fmtp", "config")
+    params += attribute_values(sessions, "rids", "params")
+    attrs = [
+        a
+        for a in attribute_values(sessions, "imageattrs", "attrs1")
+        + attribute_values(sessions, "imageattrs", "attrs2")
+        if a != "*"
+    ]
+    scalars = [v for config in params for v in re.split(r"[;=,\s]+", config) if v]
+
+    rows = [
+        ("parseParams", old_parse_params, parseParams, params),
+        (
+            "parseImageAttributes",
+            old_parse_image_attributes,
+            parseImageAttributes,
+            attrs,
+        ),
+        ("toIntIfInt", convertNumber, toIntIfInt, scalars),
+    ]
+    print("%-22s %12s %12s %8s" % ("", "before/sec", "after/sec", "speedup"))
+    for name, old, new, items in rows:
+        before = rate(old, items, count)
+        after = rate(new, items, count)
+        print("%-22s %12.0f %12.0f %7.1fx" % (name, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,30 @@
+# Measures parse() throughput in SDP lines/sec over the tests/sdps corpus.
+#
+#   python -m benchmarks.parse_lines [repeat]
+import sys
+import time
+
+from sdp_transform import parse
+
+from .suite import load_corpus
+
+
+def main(repeat=200):
+    corpus = list(load_corpus().values())
+    lines = sum(len(sdp.splitlines()) for sdp in corpus)
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for sdp in corpus:
+                parse(sdp)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(
+        "%d sdps, %d lines x %d: %.0f lines/sec"
+        % (len(corpus), lines, repeat, lines * repeat / best)
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,37 @@
+# parse(sdp, fields=...) against a full parse(), for projections consumers
+# typically ask for, over tests/sdps and a generated 10-section SDP.
+#
+#   python -m benchmarks.projection [count]
+import sys
+
+from sdp_transform import parse
+
+from .generate import make_sdp
+from .suite import load_corpus, rate
+
+PROJECTIONS = [
+    ("dtls/ice", {"fingerprint", "setup", "mid", "candidates"}),
+    ("bundle", {"groups", "mid"}),
+    ("codecs", {"rtp", "fmtp"}),
+    ("ssrcs", {"ssrcs", "ssrcGroups", "msid"}),
+]
+
+
+def main(count=5000):
+    inputs = [
+        ("tests/sdps", list(load_corpus().values())),
+        ("generated", [make_sdp(media=10, candidates=4, ssrcs=2)]),
+    ]
+    print("%-12s %-10s %12s %8s" % ("input", "fields", "parses/sec", "speedup"))
+    for label, sdps in inputs:
+        full = rate(parse, sdps, count)
+        print("%-12s %-10s %12.0f %8s" % (label, "all", full, ""))
+        for name, fields in PROJECTIONS:
+            projected = rate(lambda sdp: parse(sdp, fields=fields), sdps, count)
+            print(
+                "%-12s %-10s %12.0f %7.1fx" % (label, name, projected, projected / full)
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
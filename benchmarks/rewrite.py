@@ -0,0 +1,60 @@
+# Rewriter against write(modify(parse(sdp))) for local edits: dropping TCP and
+# private-address candidates and rewriting c= addresses, on candidate-heavy
+# and many-section SDPs.
+#
+#   python -m benchmarks.rewrite [count]
+import sys
+import time
+
+from sdp_transform import Rewriter, parse, write
+
+from .generate import make_sdp
+from .suite import rate
+
+PUBLIC = "198.51.100.7"
+
+INPUTS = [
+    ("candidates-1000", make_sdp(media=1, candidates=1000)),
+    ("ssrcs-1000", make_sdp(media=1, ssrcs=1000)),
+    ("media-20", make_sdp(media=20, candidates=8, ssrcs=4)),
+]
+
+
+def keep_candidate(candidate):
+    private = candidate["ip"].startswith(("10.", "192.168."))
+    return candidate["protocol"].lower() != "tcp" and not private
+
+
+def modify(session):
+    for location in [session] + session["media"]:
+        if location.get("connection"):
+            location["connection"]["ip"] = PUBLIC
+        if location.get("candidates"):
+            location["candidates"] = [
+                c for c in location["candidates"] if keep_candidate(c)
+            ]
+    return session
+
+
+def round_trip(sdp):
+    return write(modify(parse(sdp)))
+
+
+rewriter = Rewriter()
+rewriter.on("a=candidates", lambda c, media: c if keep_candidate(c) else None)
+rewriter.on("c=connection", lambda c, media: dict(c, ip=PUBLIC))
+
+
+def main(count=10, rounds=7):
+    # the two variants take turns, best round of each is kept
+    print("%-18s %12s %12s %8s" % ("sdp", "parse/sec", "rewrite/sec", "speedup"))
+    for name, sdp in INPUTS:
+        before = after = 0
+        for _ in range(rounds):
+            before = max(before, rate(round_trip, [sdp], count, time.process_time))
+            after = max(after, rate(rewriter.rewrite, [sdp], count, time.process_time))
+        print("%-18s %12.1f %12.1f %7.2fx" % (name, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
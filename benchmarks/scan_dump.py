@@ -0,0 +1,74 @@
+# scanFile over a generated signaling log (SIP headers around tests/sdps
+# bodies) against reading the whole log into a str and splitting it there.
+#
+#   python -m benchmarks.scan_dump [megabytes] [workers]
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sdp_transform import parse, scanFile
+
+from .suite import SDPS
+
+HEADERS = (
+    b"2026-01-01 12:00:00.000 INVITE sip:bob@example.com SIP/2.0\r\n"
+    b"Via: SIP/2.0/UDP 192.0.2.1:5060\r\n"
+    b"Content-Type: application/sdp\r\n\r\n"
+)
+bodyReg = re.compile(r"^v=0\r?\n(?:[a-uw-z]=[^\r\n]*(?:\r?\n|\r|\Z))*", re.M)
+
+
+def write_dump(f, megabytes):
+    bodies = []
+    for filename in sorted(os.listdir(SDPS)):
+        if filename.endswith("sdp"):
+            with open(os.path.join(SDPS, filename), "rb") as sdp:
+                bodies.append(HEADERS + sdp.read().rstrip(b"\r\n") + b"\r\n")
+    size = 0
+    while size < megabytes << 20:
+        for body in bodies:
+            f.write(body)
+            size += len(body)
+    f.flush()
+
+
+def read_all(path):
+    with open(path, encoding="utf-8", errors="surrogateescape", newline="") as f:
+        text = f.read()
+    return [(m.start(), parse(m.group())) for m in bodyReg.finditer(text)]
+
+
+def measure(fn, *args):
+    # timed on its own, then run again under tracemalloc for the peak
+    start = time.perf_counter()
+    count = sum(1 for _ in fn(*args))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    sum(1 for _ in fn(*args))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(megabytes=64, workers=os.cpu_count() or 1):
+    with tempfile.NamedTemporaryFile(suffix=".log") as f:
+        write_dump(f, megabytes)
+        rows = [
+            ("read + parse all", read_all, f.name),
+            ("scanFile", scanFile, f.name),
+            ("scanFile x%d" % workers, scanFile, f.name, workers),
+        ]
+        print("%-20s %8s %10s %12s" % ("", "bodies", "MB/sec", "peak (MB)"))
+        for name, fn, *args in rows:
+            count, elapsed, peak = measure(fn, *args)
+            print(
+                "%-20s %8d %10.1f %12.1f"
+                % (name, count, megabytes / elapsed, peak / (1 << 20))
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,61 @@
+# Scaling of mediaSsrcs() against a per-source scan of the flat ssrcs list,
+# on a section with N sources, each with cname/msid attributes and paired
+# into FID groups.
+#
+#   python -m benchmarks.ssrc_index [N ...]
+import sys
+import time
+
+from sdp_transform import mediaSsrcs, parse
+
+from .generate import make_sdp
+
+
+def scan(media):
+    # what callers do without the index: one pass per source
+    ids = []
+    for entry in media["ssrcs"]:
+        if entry["id"] not in ids:
+            ids.append(entry["id"])
+    view = {}
+    for ssrc in ids:
+        attributes = {
+            e["attribute"]: e.get("value") for e in media["ssrcs"] if e["id"] == ssrc
+        }
+        groups = [
+            g
+            for g in media.get("ssrcGroups", [])
+            if str(ssrc) in g["ssrcs"].split(" ")
+        ]
+        view[ssrc] = (attributes, groups)
+    return view
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(*counts):
+    print("%8s %12s %12s %12s" % ("ssrcs", "parse (ms)", "index (ms)", "scan (ms)"))
+    for count in counts or (50, 500, 5000):
+        sdp = make_sdp(media=1, ssrcs=count, fid=True)
+        media = parse(sdp)["media"][0]
+        repeat = 5 if count <= 500 else 1
+        print(
+            "%8d %12.2f %12.2f %12.2f"
+            % (
+                count,
+                best(lambda: parse(sdp), repeat) * 1000,
+                best(lambda: dict(mediaSsrcs(media)), repeat) * 1000,
+                best(lambda: scan(media), repeat) * 1000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
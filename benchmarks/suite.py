@@ -0,0 +1,179 @@
+# Benchmark cases over tests/sdps and generated SDPs, their measurement, and
+# saving/comparing results as JSON.
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from sdp_transform import (
+    parse,
+    parseImageAttributes,
+    parseParams,
+    parseSimulcastStreamList,
+    write,
+)
+from sdp_transform.__version__ import __version__
+
+from .generate import make_sdp
+
+SDPS = os.path.join(os.path.dirname(__file__), "..", "tests", "sdps")
+
+MEDIA_COUNTS = (1, 10, 100, 1000)
+ENTRY_COUNTS = (10, 100, 1000, 10000)
+QUICK_MEDIA_COUNTS = (1, 10, 100)
+QUICK_ENTRY_COUNTS = (10, 100, 1000)
+
+
+def load_corpus():
+    corpus = {}
+    for filename in sorted(os.listdir(SDPS)):
+        if filename.endswith("sdp"):
+            with open(os.path.join(SDPS, filename)) as f:
+                corpus[filename[:-4]] = f.read()
+    return corpus
+
+
+def attribute_values(sessions, push, name):
+    return [
+        entry[name]
+        for session in sessions
+        for media in session["media"]
+        for entry in media.get(push, [])
+        if entry.get(name) is not None
+    ]
+
+
+def rate(fn, items, count, clock=time.perf_counter):
+    # calls/sec of fn over count calls, cycling through items
+    start = clock()
+    for i in range(count):
+        fn(items[i % len(items)])
+    return count / (clock() - start)
+
+
+def cases(quick=False):
+    # (name, fn, args); every call of fn takes the next item of args
+    corpus = load_corpus()
+    for name, sdp in corpus.items():
+        yield "parse/" + name, parse, [sdp]
+        yield "write/" + name, write, [parse(sdp)]
+
+    sessions = [parse(sdp) for sdp in corpus.values()]
+    yield "parseParams/fmtp", parseParams, attribute_values(sessions, "fmtp", "config")
+    yield "parseParams/rid", parseParams, attribute_values(sessions, "rids", "params")
+    attrs = attribute_values(sessions, "imageattrs", "attrs1") + attribute_values(
+        sessions, "imageattrs", "attrs2"
+    )
+    yield "parseImageAttributes", parseImageAttributes, [a for a in attrs if a != "*"]
+    lists = [
+        media["simulcast"][key]
+        for session in sessions
+        for media in session["media"]
+        if media.get("simulcast")
+        for key in ("list1", "list2")
+        if media["simulcast"].get(key)
+    ]
+    yield "parseSimulcastStreamList", parseSimulcastStreamList, lists
+
+    for count in QUICK_MEDIA_COUNTS if quick else MEDIA_COUNTS:
+        sdp = make_sdp(media=count, candidates=2, ssrcs=2)
+        yield "parse/gen-media-%d" % count, parse, [sdp]
+        yield "write/gen-media-%d" % count, write, [parse(sdp)]
+    for count in QUICK_ENTRY_COUNTS if quick else ENTRY_COUNTS:
+        sdp = make_sdp(media=1, candidates=count)
+        yield "parse/gen-candidates-%d" % count, parse, [sdp]
+        yield "write/gen-candidates-%d" % count, write, [parse(sdp)]
+        sdp = make_sdp(media=1, ssrcs=count)
+        yield "parse/gen-ssrcs-%d" % count, parse, [sdp]
+        yield "write/gen-ssrcs-%d" % count, write, [parse(sdp)]
+
+
+def measure(fn, args, seconds):
+    # per-call latencies until the time budget is spent (at least 5 calls),
+    # then the peak traced allocation of a single call
+    latencies = []
+    spent = 0.0
+    i = 0
+    clock = time.perf_counter
+    while spent < seconds or len(latencies) < 5:
+        arg = args[i % len(args)]
+        start = clock()
+        fn(arg)
+        elapsed = clock() - start
+        latencies.append(elapsed)
+        spent += elapsed
+        i += 1
+    latencies.sort()
+
+    tracemalloc.start()
+    fn(args[0])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "calls": len(latencies),
+        "ops": len(latencies) / spent,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "peak": peak,
+    }
+
+
+def run(seconds=0.2, quick=False, match=None, out=sys.stdout):
+    results = {}
+    out.write(
+        "%-36s %12s %10s %10s %10s\n"
+        % ("case", "ops/sec", "p50 (us)", "p99 (us)", "peak (KB)")
+    )
+    for name, fn, args in cases(quick):
+        if (match and match not in name) or not args:
+            continue
+        result = results[name] = measure(fn, args, seconds)
+        out.write(
+            "%-36s %12.0f %10.1f %10.1f %10.1f\n"
+            % (
+                name,
+                result["ops"],
+                result["p50"] * 1e6,
+                result["p99"] * 1e6,
+                result["peak"] / 1024,
+            )
+        )
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def save(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def compare(base_path, head_path, threshold=0.1, out=sys.stdout):
+    # ops/sec of head relative to base; returns the cases slower than threshold
+    with open(base_path) as f:
+        base = json.load(f)["results"]
+    with open(head_path) as f:
+        head = json.load(f)["results"]
+    slower = []
+    out.write("%-36s %12s %12s %8s\n" % ("case", "base ops", "head ops", "change"))
+    for name in sorted(set(base) & set(head)):
+        change = head[name]["ops"] / base[name]["ops"] - 1
+        flag = ""
+        if change < -threshold:
+            slower.append(name)
+            flag = "  <- slower"
+        out.write(
+            "%-36s %12.0f %12.0f %+7.1f%%%s\n"
+            % (name, base[name]["ops"], head[name]["ops"], change * 100, flag)
+        )
+    return slower
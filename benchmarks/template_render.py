@@ -0,0 +1,61 @@
+# Renders answers from a compiled template, where only ufrag/pwd, fingerprint,
+# ports, ssrcs and candidates change, against write() of the full session.
+#
+#   python -m benchmarks.template_render [repeat]
+import sys
+import time
+
+from sdp_transform import compileTemplate, parse, write
+
+from .suite import load_corpus
+
+SCALAR_SLOTS = ["iceUfrag", "icePwd", "fingerprint", "port"]
+SLOTS = SCALAR_SLOTS + ["ssrcs", "candidates"]
+
+
+def per_call(fn, repeat):
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = (time.perf_counter() - start) / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(repeat=2000):
+    print(
+        "%-28s %10s %14s %14s"
+        % ("sdp", "write (us)", "scalar slots", "+ssrcs/cands")
+    )
+    for filename, sdp in load_corpus().items():
+        session = parse(sdp)
+        scalar = compileTemplate(session, SCALAR_SLOTS)
+        template = compileTemplate(session, SLOTS)
+        values = {
+            "iceUfrag": "abcd",
+            "icePwd": "0123456789abcdef012345",
+            "media": [
+                {"port": 9, "candidates": m.get("candidates"), "ssrcs": m.get("ssrcs")}
+                for m in session["media"]
+            ],
+        }
+        written = per_call(lambda: write(session), repeat)
+        fast = per_call(lambda: scalar.render(values), repeat)
+        rendered = per_call(lambda: template.render(values), repeat)
+        print(
+            "%-28s %10.1f %7.1f %5.1fx %7.1f %5.1fx"
+            % (
+                filename,
+                written * 1e6,
+                fast * 1e6,
+                written / fast,
+                rendered * 1e6,
+                written / rendered,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
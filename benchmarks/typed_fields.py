@@ -0,0 +1,43 @@
+# parse() with the converters declared by the grammar's "types" against
+# running every captured value through toIntIfInt, on candidate- and
+# ssrc-heavy SDPs.
+#
+#   python -m benchmarks.typed_fields [count]
+import sys
+import time
+
+from sdp_transform import parse
+from sdp_transform.grammar import grammar
+
+from .generate import make_sdp
+from .suite import rate
+
+INPUTS = [
+    ("candidates-1000", make_sdp(media=1, candidates=1000)),
+    ("ssrcs-1000", make_sdp(media=1, ssrcs=1000)),
+    ("media-20", make_sdp(media=20, candidates=8, ssrcs=4)),
+]
+
+
+def use(converters):
+    for rules in grammar.values():
+        for obj in rules:
+            obj["convert"] = converters.get(id(obj))
+
+
+def main(count=10, rounds=7):
+    # the two variants take turns, best round of each is kept
+    declared = {id(obj): obj["convert"] for rules in grammar.values() for obj in rules}
+    print("%-18s %10s %10s %8s" % ("sdp", "auto/sec", "typed/sec", "speedup"))
+    for name, sdp in INPUTS:
+        auto = typed = 0
+        for _ in range(rounds):
+            use({})
+            auto = max(auto, rate(parse, [sdp], count, time.process_time))
+            use(declared)
+            typed = max(typed, rate(parse, [sdp], count, time.process_time))
+        print("%-18s %10.1f %10.1f %7.2fx" % (name, auto, typed, typed / auto))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
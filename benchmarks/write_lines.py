@@ -0,0 +1,30 @@
+# Measures write() throughput in SDP lines/sec over the tests/sdps corpus.
+#
+#   python -m benchmarks.write_lines [repeat]
+import sys
+import time
+
+from sdp_transform import parse, write
+
+from .suite import load_corpus
+
+
+def main(repeat=200):
+    corpus = [parse(sdp) for sdp in load_corpus().values()]
+    lines = sum(len(write(session).splitlines()) for session in corpus)
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for session in corpus:
+                write(session)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(
+        "%d sdps, %d lines x %d: %.0f lines/sec"
+        % (len(corpus), lines, repeat, lines * repeat / best)
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
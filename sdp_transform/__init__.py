@@ -1,11 +1,56 @@
-from .parser import parse, parseParams, parseImageAttributes, parseSimulcastStreamList
-from .writer import write
+from .parser import (
+    parse,
+    parseIter,
+    parseParams,
+    parseImageAttributes,
+    parseSimulcastStreamList,
+)
+from .bulk import parseMany, writeMany
+from .cache import ParseCache
+from .candidate import parseCandidate, writeCandidate
+from .diff import diff, applyPatch
+from .frozen import evolve, freeze, replace, thaw
+from .lazy import parseLazy
+from .rewrite import Rewriter
+from .scan import scanFile
+from .session import parseEditable, track
+from .stats import Stats
+from .template import compileTemplate
+from .transcode import fromJson, toJson
+from .views import mediaCodecs, mediaSsrcs, parseIndexed, sessionMids
+from .writer import write, writeInto
 
 
 __all__ = [
+    "ParseCache",
+    "Rewriter",
+    "Stats",
+    "applyPatch",
+    "compileTemplate",
+    "diff",
+    "evolve",
+    "freeze",
+    "fromJson",
+    "mediaCodecs",
+    "mediaSsrcs",
     "parse",
+    "parseCandidate",
+    "parseIter",
+    "parseLazy",
+    "parseMany",
+    "parseEditable",
     "parseParams",
     "parseImageAttributes",
+    "parseIndexed",
     "parseSimulcastStreamList",
+    "replace",
+    "scanFile",
+    "sessionMids",
+    "thaw",
+    "toJson",
+    "track",
     "write",
+    "writeCandidate",
+    "writeInto",
+    "writeMany",
 ]
@@ -0,0 +1,5 @@
+import sys
+
+from .bulk import main
+
+sys.exit(main())
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import tee
+
+from .parser import parse
+from .writer import write
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def runBatch(fn, batch):
+    # one (result, error) pair per item, so a bad entry doesn't sink its batch
+    results = []
+    for item in batch:
+        try:
+            results.append((fn(item), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+def mapMany(fn, items, workers=None, chunksize=64):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    batches = batched(items, chunksize)
+    if workers <= 1:
+        for batch in batches:
+            yield from runBatch(fn, batch)
+        return
+
+    # keep a couple of batches per worker in flight and hand results back in
+    # input order, without pulling the whole input into memory
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(runBatch, fn, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parseMany(sdps, workers=None, chunksize=64):
+    return mapMany(parse, sdps, workers, chunksize)
+
+
+def writeMany(sessions, workers=None, chunksize=64):
+    return mapMany(write, sessions, workers, chunksize)
+
+
+def readLine(line):
+    if line.startswith(b'"'):
+        return json.loads(line)
+    return line.replace(b"\\r", b"\r").replace(b"\\n", b"\n")
+
+
+def readInputs(path):
+    # a directory holds one SDP per file; any other file holds one SDP per
+    # line, either as a JSON string or with its line breaks written as \r\n.
+    # Files are read as bytes and left to parse() to decode; an entry that
+    # can't be read comes out as (source, error) in place of its SDP
+    if os.path.isdir(path):
+        for filename in sorted(os.listdir(path)):
+            filepath = os.path.join(path, filename)
+            if os.path.isfile(filepath):
+                try:
+                    with open(filepath, "rb") as f:
+                        sdp = f.read()
+                except OSError as e:
+                    sdp = e
+                yield filepath, sdp
+        return
+
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                sdp = readLine(line)
+            except ValueError as e:
+                sdp = e
+            yield "%s:%d" % (path, number), sdp
+
+
+def parseInput(sdp):
+    # read errors from readInputs() are reported like parse errors
+    if isinstance(sdp, Exception):
+        raise sdp
+    return parse(sdp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sdp-transform",
+        description="Parse a directory or a newline-delimited file of SDPs "
+        "and print one JSON object per SDP.",
+    )
+    parser.add_argument("path")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-c", "--chunksize", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    sources, sdps = tee(readInputs(args.path))
+    results = mapMany(
+        parseInput, (sdp for _, sdp in sdps), args.workers, args.chunksize
+    )
+    failed = 0
+    for (source, _), (session, error) in zip(sources, results):
+        if error is None:
+            line = {"source": source, "session": session}
+        else:
+            failed += 1
+            line = {"source": source, "error": "%s: %s" % (type(error).__name__, error)}
+        sys.stdout.write(json.dumps(line) + "\n")
+    return 1 if failed else 0
@@ -0,0 +1,53 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from .frozen import freeze
+from .parser import parse, toText
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class ParseCache:
+    # bounded LRU around parse(), keyed on the SDP text. Results are frozen and
+    # shared between callers: thaw() (or copy.deepcopy) one before changing it,
+    # or derive a new one with evolve()/replace()
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def parse(self, sdp):
+        key = toText(sdp)
+        with self.lock:
+            session = self.entries.get(key)
+            if session is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return session
+            self.misses += 1
+
+        session = freeze(parse(key))
+
+        with self.lock:
+            self.entries[key] = session
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return session
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, self.maxsize, len(self.entries)
+            )
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,90 @@
+from .parser import toIntIfInt, toText
+
+# trailing "name value" pairs with a key of their own; anything else is kept
+# in candidate["extensions"] so that it can be written back. The TCP type is
+# read from either "tcptype" (RFC 6544) or "tcpfield", and written as
+# "tcptype" like write() does
+pairNames = {
+    "raddr": "raddr",
+    "rport": "rport",
+    "tcptype": "tcptype",
+    "tcpfield": "tcptype",
+    "generation": "generation",
+    "network-id": "network-id",
+    "network-cost": "network-cost",
+}
+intNames = {"rport", "generation", "network-id", "network-cost"}
+pairOrder = (
+    ("raddr", "raddr"),
+    ("rport", "rport"),
+    ("tcptype", "tcptype"),
+    ("generation", "generation"),
+    ("network-id", "network-id"),
+    ("network-cost", "network-cost"),
+)
+
+
+def parseCandidate(line):
+    # a single (trickled) candidate, with or without the leading "a=", as the
+    # dict parse() would put in media["candidates"]; None if it isn't one
+    line = toText(line).strip()
+    if line.startswith("a="):
+        line = line[2:]
+    if not line.startswith("candidate:"):
+        return None
+    parts = line[10:].split()
+    if len(parts) < 8 or parts[6] != "typ":
+        return None
+    component, priority, port = parts[1], parts[3], parts[5]
+    if not (component.isdecimal() and priority.isdecimal() and port.isdecimal()):
+        return None
+
+    candidate = {
+        "foundation": toIntIfInt(parts[0]),
+        "component": int(component),
+        "protocol": parts[2],
+        "priority": int(priority),
+        "ip": toIntIfInt(parts[4]),
+        "port": int(port),
+        "type": parts[7],
+    }
+    extensions = {}
+    for i in range(8, len(parts) - 1, 2):
+        key, value = parts[i], parts[i + 1]
+        name = pairNames.get(key)
+        if name is None or (name in intNames and not value.isdecimal()):
+            extensions[key] = value
+        elif name in intNames:
+            candidate[name] = int(value)
+        else:
+            candidate[name] = toIntIfInt(value)
+    if (len(parts) - 8) % 2:
+        # an unpaired last token is kept, without value
+        extensions[parts[-1]] = None
+    if extensions:
+        candidate["extensions"] = extensions
+    return candidate
+
+
+def writeCandidate(candidate) -> str:
+    # "candidate:..." without the "a=" prefix, the form trickle ICE carries
+    parts = [
+        "candidate:%s" % candidate["foundation"],
+        str(candidate["component"]),
+        str(candidate["protocol"]),
+        str(candidate["priority"]),
+        str(candidate["ip"]),
+        str(candidate["port"]),
+        "typ",
+        str(candidate["type"]),
+    ]
+    for name, keyword in pairOrder:
+        value = candidate.get(name)
+        if value is not None:
+            parts.append(keyword)
+            parts.append(str(value))
+    for key, value in (candidate.get("extensions") or {}).items():
+        parts.append(key)
+        if value is not None:
+            parts.append(str(value))
+    return " ".join(parts)
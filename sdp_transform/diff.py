@@ -0,0 +1,172 @@
+from collections.abc import MutableSequence
+from copy import deepcopy
+
+from .grammar import grammar
+
+# what identifies an entry of a push list across two versions of a session;
+# rules not listed here are keyed on all of their names
+naturalKeys = {
+    "bandwidth": ("type",),
+    "rtp": ("payload",),
+    "fmtp": ("payload",),
+    "rtcpFbTrrInt": ("payload",),
+    "rtcpFb": ("payload", "type", "subtype"),
+    "ext": ("value",),
+    "crypto": ("id",),
+    "candidates": ("foundation", "component"),
+    "ssrcs": ("id", "attribute"),
+    "ssrcGroups": ("semantics", "ssrcs"),
+    "groups": ("type",),
+    "rids": ("id",),
+    "imageattrs": ("pt",),
+}
+
+listKeys = {
+    obj["push"]: naturalKeys.get(obj["push"], tuple(obj["names"]))
+    for objs in grammar.values()
+    for obj in objs
+    if obj.get("push")
+}
+
+
+def entryKeys(items, keyFn):
+    # natural key plus its occurrence, so duplicates still pair up in order
+    seen = {}
+    keys = []
+    for item in items:
+        key = keyFn(item)
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        keys.append((key, n))
+    return keys
+
+
+def diffList(old, new, keyFn, diffItem):
+    # {"remove": [key], "change": [(key, patch)], "add": [(index, item)]}, or
+    # {"set": new} when the entries both sides share were reordered
+    oldKeys = entryKeys(old, keyFn)
+    newKeys = entryKeys(new, keyFn)
+    oldIndex = dict(zip(oldKeys, old))
+    newSet = set(newKeys)
+    kept = [k for k in newKeys if k in oldIndex]
+    if [k for k in oldKeys if k in newSet] != kept:
+        return {"set": new}
+
+    patch = {}
+    remove = [k for k in oldKeys if k not in newSet]
+    change = []
+    add = []
+    for index, (key, item) in enumerate(zip(newKeys, new)):
+        if key not in oldIndex:
+            add.append((index, item))
+        else:
+            itemPatch = diffItem(oldIndex[key], item)
+            if itemPatch is not None:
+                change.append((key, itemPatch))
+    if remove:
+        patch["remove"] = remove
+    if change:
+        patch["change"] = change
+    if add:
+        patch["add"] = add
+    return patch
+
+
+def isList(value):
+    return isinstance(value, MutableSequence)
+
+
+def listKey(key):
+    names = listKeys[key]
+    return lambda entry: tuple(entry.get(n) for n in names)
+
+
+def mediaKey(byMid):
+    return (lambda m: m["mid"]) if byMid else (lambda m: None)
+
+
+def diffEntry(old, new):
+    return None if old == new else new
+
+
+def diffSection(old, new):
+    # {"set": {key: value}, "remove": [key], "lists": {key: listPatch}}
+    patch = {}
+    for key in new:
+        if key == "media":
+            continue
+        value = new[key]
+        if key not in old:
+            patch.setdefault("set", {})[key] = value
+        elif key in listKeys and isList(value) and isList(old[key]):
+            if old[key] != value:
+                listPatch = diffList(old[key], value, listKey(key), diffEntry)
+                patch.setdefault("lists", {})[key] = listPatch
+        elif old[key] != value:
+            patch.setdefault("set", {})[key] = value
+    remove = [key for key in old if key not in new and key != "media"]
+    if remove:
+        patch["remove"] = remove
+    return patch
+
+
+def diffMedia(old, new):
+    patch = diffSection(old, new)
+    return patch or None
+
+
+def diff(old, new) -> dict:
+    # compact change set between two parsed sessions; media sections pair up by
+    # mid when every section has one, by position otherwise
+    patch = diffSection(old, new)
+    oldMedia = old.get("media", [])
+    newMedia = new.get("media", [])
+    byMid = all(m.get("mid") is not None for m in [*oldMedia, *newMedia])
+    mediaPatch = diffList(oldMedia, newMedia, mediaKey(byMid), diffMedia)
+    if mediaPatch:
+        mediaPatch["byMid"] = byMid
+        patch["media"] = mediaPatch
+    return patch
+
+
+def applyList(location, key, patch, keyFn, applyItem):
+    if "set" in patch:
+        location[key] = deepcopy(patch["set"])
+        return
+    items = location.get(key)
+    if items is None:
+        items = location[key] = []
+    remove = set(patch.get("remove", ()))
+    change = dict(patch.get("change", ()))
+    keys = entryKeys(items, keyFn)
+    for i in reversed(range(len(items))):
+        if keys[i] in remove:
+            del items[i]
+        elif keys[i] in change:
+            items[i] = applyItem(items[i], change[keys[i]])
+    for index, item in patch.get("add", ()):
+        items.insert(index, deepcopy(item))
+
+
+def replaceEntry(old, new):
+    return deepcopy(new)
+
+
+def applySection(location, patch):
+    for key in patch.get("remove", ()):
+        del location[key]
+    for key, value in patch.get("set", {}).items():
+        location[key] = deepcopy(value)
+    for key, listPatch in patch.get("lists", {}).items():
+        applyList(location, key, listPatch, listKey(key), replaceEntry)
+    return location
+
+
+def applyPatch(session, patch):
+    # updates session in place with the output of diff(); returns session
+    applySection(session, patch)
+    if "media" in patch:
+        mediaPatch = patch["media"]
+        keyFn = mediaKey(mediaPatch.get("byMid"))
+        applyList(session, "media", mediaPatch, keyFn, applySection)
+    return session
@@ -0,0 +1,80 @@
+from collections.abc import Mapping
+
+
+def readOnly(self, *args, **kwargs):
+    raise TypeError("frozen session, use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    # a dict that refuses changes; reads stay plain dict operations and it
+    # still compares equal to, and serializes like, a regular dict
+    __slots__ = ()
+    __setitem__ = __delitem__ = readOnly
+    clear = pop = popitem = setdefault = update = __ior__ = readOnly
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class FrozenList(list):
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = readOnly
+    append = extend = insert = pop = remove = reverse = sort = clear = readOnly
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(value):
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    # plain, mutable deep copy of a frozen (or any) session
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+def replace(value, path, new):
+    # a frozen copy of value with new stored at path, a sequence of keys and
+    # list indices: only the containers along the path are copied, every other
+    # section, list and entry is shared with value
+    if not path:
+        return freeze(new)
+    key = path[0]
+    if isinstance(value, list):
+        items = list(value)
+        items[key] = replace(items[key], path[1:], new)
+        return FrozenList(items)
+    items = dict(value)
+    items[key] = replace(items[key], path[1:], new) if len(path) > 1 else freeze(new)
+    return FrozenDict(items)
+
+
+def evolve(value, path, fn):
+    # replace() with fn(current value at path), e.g. a list with an entry added
+    current = value
+    for key in path:
+        current = current[key]
+    return replace(value, path, fn(current))
@@ -1,8 +1,19 @@
 import re
 
-
+# "intern" lists the names (or, for single value rules, the rule's own name)
+# whose values parse() passes through sys.intern: tokens nearly every session
+# repeats (codec names, extmap URIs, IN, udp, host, ...) are then stored once
+# across all retained sessions. Only list values drawn from a small fixed set:
+# interned strings may never be freed (they are immortal on Python 3.12), so
+# per-session values (fmtp configs, msid tokens, ssrc values, usernames, ...)
+# would pile up in a long-running process.
+# "types" declares how parse() converts a captured value (names not listed are
+# "auto"): "int" for \d groups (an empty match stays ''), "enum" for groups
+# that can only hold fixed words and are kept as str, "str" to always keep the
+# text, "float", and "auto" to guess int, then float, then str (toIntIfInt).
+# Declared types are picked up when the parser compiles the grammar on import
 grammar = {
-    "v": [{"name": "version", "reg": r"^(\d*)$"}],
+    "v": [{"name": "version", "reg": r"^(\d*)$", "types": {"version": "int"}}],
     "o": [
         {
             # o=- 20518 0 IN IP4 203.0.113.1
@@ -17,6 +28,8 @@ grammar = {
                 "ipVer",
                 "address",
             ],
+            "types": {"sessionId": "int", "sessionVersion": "int", "ipVer": "int"},
+            "intern": ["netType"],
             "format": "%s %s %d %s IP%d %s",
         }
     ],
@@ -36,6 +49,7 @@ grammar = {
             "name": "timing",
             "reg": r"^(\d*) (\d*)",
             "names": ["start", "stop"],
+            "types": {"start": "int", "stop": "int"},
             "format": "%d %d",
         }
     ],
@@ -45,6 +59,7 @@ grammar = {
             "name": "connection",
             "reg": r"^IN IP(\d) (\S*)",
             "names": ["version", "ip"],
+            "types": {"version": "int"},
             "format": "IN IP%d %s",
         }
     ],
@@ -54,6 +69,8 @@ grammar = {
             "push": "bandwidth",
             "reg": r"^(TIAS|AS|CT|RR|RS):(\d*)",
             "names": ["type", "limit"],
+            "types": {"type": "enum", "limit": "int"},
+            "intern": ["type"],
             "format": "%s:%s",
         }
     ],
@@ -64,6 +81,8 @@ grammar = {
             # TODO: rtp/fmtp should be filtered by the payloads found here?
             "reg": r"^(\w*) (\d*) ([\w/]*)(?: (.*))?",
             "names": ["type", "port", "protocol", "payloads"],
+            "types": {"port": "int"},
+            "intern": ["type", "protocol"],
             "format": "%s %d %s %s",
         }
     ],
@@ -73,6 +92,8 @@ grammar = {
             "push": "rtp",
             "reg": r"^rtpmap:(\d*) ([\w\-.]*)(?:\s*\/(\d*)(?:\s*\/(\S*))?)?",
             "names": ["payload", "codec", "rate", "encoding"],
+            "types": {"payload": "int", "rate": "int"},
+            "intern": ["codec"],
             "format": lambda o: (
                 "rtpmap:%d %s/%s/%s"
                 if o.get("encoding") is not None
@@ -87,6 +108,7 @@ grammar = {
             "push": "fmtp",
             "reg": r"^fmtp:(\d*) ([\S| ]*)",
             "names": ["payload", "config"],
+            "types": {"payload": "int"},
             "format": "fmtp:%d %s",
         },
         {
@@ -100,6 +122,8 @@ grammar = {
             "name": "rtcp",
             "reg": r"^rtcp:(\d*)(?: (\S*) IP(\d) (\S*))?",
             "names": ["port", "netType", "ipVer", "address"],
+            "types": {"port": "int", "ipVer": "int"},
+            "intern": ["netType"],
             "format": lambda o: (
                 "rtcp:%d %s IP%d %s" if o.get("address") is not None else "rtcp:%d"
             ),
@@ -109,6 +133,7 @@ grammar = {
             "push": "rtcpFbTrrInt",
             "reg": r"^rtcp-fb:(\*|\d*) trr-int (\d*)",
             "names": ["payload", "value"],
+            "types": {"value": "int"},
             "format": "rtcp-fb:%s trr-int %d",
         },
         {
@@ -116,6 +141,7 @@ grammar = {
             "push": "rtcpFb",
             "reg": r"^rtcp-fb:(\*|\d*) ([\w\-_]*)(?: ([\w\-_]*))?",
             "names": ["payload", "type", "subtype"],
+            "intern": ["type", "subtype"],
             "format": lambda o: (
                 "rtcp-fb:%s %s %s" if o.get("subtype") is not None else "rtcp-fb:%s %s"
             ),
@@ -127,6 +153,8 @@ grammar = {
             "push": "ext",
             "reg": r"^extmap:(\d+)(?:\/(\w+))?(?: (urn:ietf:params:rtp-hdrext:encrypt))? (\S*)(?: (\S*))?",
             "names": ["value", "direction", "encrypt-uri", "uri", "config"],
+            "types": {"value": "int", "encrypt-uri": "enum"},
+            "intern": ["direction", "encrypt-uri", "uri"],
             "format": lambda o: "extmap:%d"
             + ("/%s" if o.get("direction") is not None else "")
             + (" %s" if o.get("encrypt-uri") is not None else "")
@@ -137,12 +165,16 @@ grammar = {
             # a=extmap-allow-mixed
             "name": "extmapAllowMixed",
             "reg": r"^(extmap-allow-mixed)",
+            "types": {"extmapAllowMixed": "enum"},
+            "intern": ["extmapAllowMixed"],
         },
         {
             # a=crypto:1 AES_CM_128_HMAC_SHA1_80 inline:PS1uQCVeeCFCanVmcjkpPywjNWhcYD0mXXtxaVBR|2^20|1:32
             "push": "crypto",
             "reg": r"^crypto:(\d*) ([\w_]*) (\S*)(?: (\S*))?",
             "names": ["id", "suite", "config", "sessionConfig"],
+            "types": {"id": "int"},
+            "intern": ["suite"],
             "format": lambda o: (
                 "crypto:%d %s %s %s"
                 if o.get("sessionConfig") is not None
@@ -153,12 +185,15 @@ grammar = {
             # a=setup:actpass
             "name": "setup",
             "reg": r"^setup:(\w*)",
+            "intern": ["setup"],
             "format": "setup:%s",
         },
         {
             # a=connection:new
             "name": "connectionType",
             "reg": r"^connection:(new|existing)",
+            "types": {"connectionType": "enum"},
+            "intern": ["connectionType"],
             "format": "connection:%s",
         },
         {
@@ -183,11 +218,15 @@ grammar = {
             # a=sendrecv
             "name": "direction",
             "reg": r"^(sendrecv|recvonly|sendonly|inactive)",
+            "types": {"direction": "enum"},
+            "intern": ["direction"],
         },
         {
             # a=ice-lite
             "name": "icelite",
             "reg": r"^(ice-lite)",
+            "types": {"icelite": "enum"},
+            "intern": ["icelite"],
         },
         {
             # a=ice-ufrag:F7gI
@@ -206,16 +245,17 @@ grammar = {
             "name": "fingerprint",
             "reg": r"^fingerprint:(\S*) (\S*)",
             "names": ["type", "hash"],
+            "intern": ["type"],
             "format": "fingerprint:%s %s",
         },
         {
             # a=candidate:0 1 UDP 2113667327 203.0.113.1 54400 typ host
             # a=candidate:1162875081 1 udp 2113937151 192.168.34.75 60017 typ host generation 0 network-id 3 network-cost 10 # noqa
             # a=candidate:3289912957 2 udp 1845501695 193.84.77.194 60017 typ srflx raddr 192.168.34.75 rport 60017 generation 0 network-id 3 network-cost 10 # noqa
-            # a=candidate:229815620 1 tcp 1518280447 192.168.150.19 60017 typ host tcpfield active generation 0 network-id 3 network-cost 10 # noqa
-            # a=candidate:3289912957 2 tcp 1845501695 193.84.77.194 60017 typ srflx raddr 192.168.34.75 rport 60017 tcpfield passive generation 0 network-id 3 network-cost 10 # noqa
+            # a=candidate:229815620 1 tcp 1518280447 192.168.150.19 60017 typ host tcptype active generation 0 network-id 3 network-cost 10 # noqa
+            # a=candidate:3289912957 2 tcp 1845501695 193.84.77.194 60017 typ srflx raddr 192.168.34.75 rport 60017 tcptype passive generation 0 network-id 3 network-cost 10 # noqa
             "push": "candidates",
-            "reg": r"^candidate:(\S*) (\d*) (\S*) (\d*) (\S*) (\d*) typ (\S*)(?: raddr (\S*) rport (\d*))?(?: tcpfield (\S*))?(?: generation (\d*))?(?: network-id (\d*))?(?: network-cost (\d*))?",  # noqa
+            "reg": r"^candidate:(\S*) (\d*) (\S*) (\d*) (\S*) (\d*) typ (\S*)(?: raddr (\S*) rport (\d*))?(?: (?:tcptype|tcpfield) (\S*))?(?: generation (\d*))?(?: network-id (\d*))?(?: network-cost (\d*))?",  # noqa
             "names": [
                 "foundation",
                 "component",
@@ -231,9 +271,19 @@ grammar = {
                 "network-id",
                 "network-cost",
             ],
+            "types": {
+                "component": "int",
+                "priority": "int",
+                "port": "int",
+                "rport": "int",
+                "generation": "int",
+                "network-id": "int",
+                "network-cost": "int",
+            },
+            "intern": ["protocol", "type", "tcptype"],
             "format": lambda o: "candidate:%s %d %s %d %s %d typ %s"
             + (" raddr %s rport %d" if o.get("raddr") is not None else "")
-            + (" tcpfield %s" if o.get("tcptype") is not None else "")
+            + (" tcptype %s" if o.get("tcptype") is not None else "")
             + (" generation %d" if o.get("generation") is not None else "")
             + (" network-id %d" if o.get("network-id") is not None else "")
             + (" network-cost %d" if o.get("network-cost") is not None else ""),
@@ -242,6 +292,8 @@ grammar = {
             # a=end-of-candidates (keep after the candidates line for readability)
             "name": "endOfCandidates",
             "reg": r"^(end-of-candidates)",
+            "types": {"endOfCandidates": "enum"},
+            "intern": ["endOfCandidates"],
         },
         {
             # a=remote-candidates:1 203.0.113.1 54400 2 203.0.113.1 54401 ...
@@ -253,6 +305,7 @@ grammar = {
             # a=ice-options:google-ice
             "name": "iceOptions",
             "reg": r"^ice-options:(\S*)",
+            "intern": ["iceOptions"],
             "format": "ice-options:%s",
         },
         {
@@ -260,6 +313,8 @@ grammar = {
             "push": "ssrcs",
             "reg": r"^ssrc:(\d*) ([\w_-]*)(?::(.*))?",
             "names": ["id", "attribute", "value"],
+            "types": {"id": "int"},
+            "intern": ["attribute"],
             "format": lambda o: "ssrc:%d"
             + (" %s" if o.get("attribute") is not None else "")
             + (":%s" if o.get("value") is not None else ""),
@@ -271,6 +326,7 @@ grammar = {
             # token-char = %x21 / %x23-27 / %x2A-2B / %x2D-2E / %x30-39 / %x41-5A / %x5E-7E
             "reg": r"^ssrc-group:([\x21\x23\x24\x25\x26\x27\x2A\x2B\x2D\x2E\w]*) (.*)",
             "names": ["semantics", "ssrcs"],
+            "intern": ["semantics"],
             "format": "ssrc-group:%s %s",
         },
         {
@@ -278,6 +334,7 @@ grammar = {
             "name": "msidSemantic",
             "reg": r"^msid-semantic:\s?(\w*) (\S*)",
             "names": ["semantic", "token"],
+            "intern": ["semantic"],
             "format": "msid-semantic: %s %s",  # space after ':' is not accidental
         },
         {
@@ -285,17 +342,22 @@ grammar = {
             "push": "groups",
             "reg": r"^group:(\w*) (.*)",
             "names": ["type", "mids"],
+            "intern": ["type"],
             "format": "group:%s %s",
         },
         {
             # a=rtcp-mux
             "name": "rtcpMux",
             "reg": r"^(rtcp-mux)",
+            "types": {"rtcpMux": "enum"},
+            "intern": ["rtcpMux"],
         },
         {
             # a=rtcp-rsize
             "name": "rtcpRsize",
             "reg": r"^(rtcp-rsize)",
+            "types": {"rtcpRsize": "enum"},
+            "intern": ["rtcpRsize"],
         },
         {
             # a=sctpmap:5000 webrtc-datachannel 1024
@@ -319,6 +381,7 @@ grammar = {
             "push": "rids",
             "reg": r"^rid:([\d\w]+) (\w+)(?: ([\S| ]*))?",
             "names": ["id", "direction", "params"],
+            "intern": ["direction"],
             "format": lambda o: (
                 "rid:%s %s %s" if o.get("params") is not None else "rid:%s %s"
             ),
@@ -339,6 +402,7 @@ grammar = {
                 r"(?:[\s\t]+(recv|send)[\s\t]+(\*|\[\S+\](?:[\s\t]+\[\S+\])*))?"
             ),
             "names": ["pt", "dir1", "attrs1", "dir2", "attrs2"],
+            "types": {"dir1": "enum", "dir2": "enum"},
             "format": lambda o: "imageattr:%s %s %s"
             + (" %s %s" if o.get("dir2") is not None else ""),
         },
@@ -360,6 +424,7 @@ grammar = {
                 r"$"
             ),
             "names": ["dir1", "list1", "dir2", "list2"],
+            "types": {"dir1": "enum", "dir2": "enum"},
             "format": lambda o: "simulcast:%s %s"
             + (" %s %s" if o.get("dir2") is not None else ""),
         },
@@ -392,12 +457,15 @@ grammar = {
                 "destAddress",
                 "srcList",
             ],
+            "types": {"filterMode": "enum", "addressTypes": "enum"},
             "format": "source-filter: %s %s %s %s %s",
         },
         {
             # a=bundle-only
             "name": "bundleOnly",
             "reg": r"^(bundle-only)",
+            "types": {"bundleOnly": "enum"},
+            "intern": ["bundleOnly"],
         },
         {
             # a=label:1
@@ -410,6 +478,7 @@ grammar = {
             # https://tools.ietf.org/html/draft-ietf-mmusic-sctp-sdp-26#section-5
             "name": "sctpPort",
             "reg": r"^sctp-port:(\d+)$",
+            "types": {"sctpPort": "int"},
             "format": "sctp-port:%s",
         },
         {
@@ -417,6 +486,7 @@ grammar = {
             # https://tools.ietf.org/html/draft-ietf-mmusic-sctp-sdp-26#section-6
             "name": "maxMessageSize",
             "reg": r"^max-message-size:(\d+)$",
+            "types": {"maxMessageSize": "int"},
             "format": "max-message-size:%s",
         },
         {
@@ -440,6 +510,7 @@ grammar = {
                 "rateNumerator",
                 "rateDenominator",
             ],
+            "types": {"rateNumerator": "int", "rateDenominator": "int"},
             "format": lambda o: "mediaclk:"
             + ("id=%s %s" if o.get("id") is not None else "%s")
             + ("=%s" if o.get("mediaClockValue") is not None else "")
@@ -463,18 +534,21 @@ grammar = {
             # a=floorctrl:c-s
             "name": "bfcpFloorCtrl",
             "reg": r"^floorctrl:(c-only|s-only|c-s)",
+            "types": {"bfcpFloorCtrl": "enum"},
             "format": "floorctrl:%s",
         },
         {
             # a=confid:1
             "name": "bfcpConfId",
             "reg": r"^confid:(\d+)",
+            "types": {"bfcpConfId": "int"},
             "format": "confid:%s",
         },
         {
             # a=userid:1
             "name": "bfcpUserId",
             "reg": r"^userid:(\d+)",
+            "types": {"bfcpUserId": "int"},
             "format": "userid:%s",
         },
         {
@@ -504,5 +578,6 @@ for key in grammar.keys():
     for obj in objs:
         if not obj.get("reg"):
             obj["reg"] = r"(.*)"
+        obj["reg"] = re.compile(obj["reg"])
         if not obj.get("format"):
             obj["format"] = "%s"
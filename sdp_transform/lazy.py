@@ -0,0 +1,97 @@
+import re
+from collections.abc import MutableMapping
+
+from .parser import isLine, parseLine, toText
+
+# start of every m= line; a lone \r is also accepted as a line break
+sectionReg = re.compile(r"^m=|(?<=\r)m=", re.M)
+
+
+class LazySection(MutableMapping):
+    # a session or media section kept as its original text until one of its
+    # keys is read; the section is then decoded once and the dict is cached
+
+    def __init__(self, text):
+        self.text = text
+        self.parsed = None
+
+    @property
+    def decoded(self):
+        return self.parsed is not None
+
+    def lines(self):
+        return [line for line in self.text.splitlines() if isLine(line)]
+
+    def blank(self):
+        return {}
+
+    def load(self):
+        if self.parsed is None:
+            parsed = self.blank()
+            for line in self.lines():
+                parseLine(parsed, line[0], line[2:])
+            self.parsed = parsed
+        return self.parsed
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __setitem__(self, key, value):
+        self.load()[key] = value
+
+    def __delitem__(self, key):
+        del self.load()[key]
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __repr__(self):
+        if self.parsed is None:
+            return "%s(<%d bytes pending>)" % (type(self).__name__, len(self.text))
+        return "%s(%r)" % (type(self).__name__, self.parsed)
+
+
+class LazyMedia(LazySection):
+    def blank(self):
+        return {"rtp": [], "fmtp": []}
+
+
+class LazySession(LazySection):
+    # "media" is known without decoding anything, so reading it leaves the
+    # session-level lines untouched
+    def __init__(self, text, media):
+        super().__init__(text)
+        self.media = media
+
+    def load(self):
+        if self.parsed is None:
+            super().load()["media"] = self.media
+        return self.parsed
+
+    def __getitem__(self, key):
+        if key == "media" and self.parsed is None:
+            return self.media
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        if key == "media" and self.parsed is None:
+            self.media = value
+        else:
+            super().__setitem__(key, value)
+
+
+def rawLines(section):
+    # the original lines of a section nobody has looked into yet, else None
+    if isinstance(section, LazySection) and section.parsed is None:
+        return section.lines()
+    return None
+
+
+def parseLazy(sdp) -> LazySession:
+    sdp = toText(sdp)
+    bounds = [match.start() for match in sectionReg.finditer(sdp)] + [len(sdp)]
+    media = [LazyMedia(sdp[start:end]) for start, end in zip(bounds, bounds[1:])]
+    return LazySession(sdp[: bounds[0]], media)
@@ -1,10 +1,24 @@
+import codecs
 import re
-from functools import reduce
+import sys
+from functools import lru_cache, partial, reduce
+from time import perf_counter
 
+from .frozen import FrozenDict, FrozenList
 from .grammar import grammar
+from .records import records
+from .stats import ruleName
 
 
-def toIntIfInt(v):
+# plain decimal ints and floats, the only numbers SDP values ever hold
+intReg = re.compile(r"[-+]?[0-9]+\Z")
+floatReg = re.compile(r"[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?\Z")
+# anything else int()/float() would still accept: surrounding whitespace,
+# underscores, non-ASCII digits, inf and nan
+otherNumberReg = re.compile(r"[^\x21-\x7e]|_|^[-+]?(?:inf|infinity|nan)$", re.I)
+
+
+def convertNumber(v):
     try:
         return int(v)
     except ValueError:
@@ -14,19 +28,71 @@ def toIntIfInt(v):
             return v
 
 
-def attachProperties(match, location, names=None, rawName=None):
+def toIntIfInt(v):
+    # same result as int(v), else float(v), else v, but classified up front so
+    # the usual non-numeric values (42e01f, VP8, UDP, ...) never raise
+    if intReg.match(v):
+        # int() refuses very long digit strings (sys.set_int_max_str_digits)
+        return int(v) if len(v) <= 640 else convertNumber(v)
+    if floatReg.match(v):
+        return float(v)
+    if otherNumberReg.search(v):
+        return convertNumber(v)
+    return v
+
+
+def toIntIfDigits(v):
+    # for \d groups: same result as toIntIfInt, without classifying first
+    return int(v) if 0 < len(v) <= 640 else toIntIfInt(v)
+
+
+def toFloatIfAny(v):
+    return float(v) if v else v
+
+
+# grammar "types" -> converter; None keeps the matched text as is
+converters = {
+    "int": toIntIfDigits,
+    "float": toFloatIfAny,
+    "enum": None,
+    "str": None,
+    "auto": toIntIfInt,
+}
+
+
+def ruleConverters(obj):
+    # one converter per captured value, in the order of names
+    types = obj.get("types") or {}
+    names = obj.get("names") or [obj.get("name")]
+    return [converters[types.get(name, "auto")] for name in names]
+
+
+def internIfStr(v):
+    return sys.intern(v) if type(v) is str else v
+
+
+def attachProperties(
+    match, location, names=None, rawName=None, interned=None, convert=None
+):
+    # interned: the names whose values are shared through sys.intern
+    # convert: ruleConverters() of the rule, toIntIfInt for every value if None
+    if convert is None:
+        convert = [toIntIfInt] * len(names or [rawName])
     if rawName and not names:
-        location[rawName] = toIntIfInt(match[1])
+        value = match[1] if convert[0] is None else convert[0](match[1])
+        location[rawName] = internIfStr(value) if interned else value
     else:
-        i = 0
-        while i < len(names):
-            if match[i + 1] is not None:
-                location[names[i]] = toIntIfInt(match[i + 1])
-            i += 1
+        for name, converter, value in zip(names, convert, match.groups()):
+            if value is not None:
+                if converter is not None:
+                    value = converter(value)
+                if interned and name in interned:
+                    value = internIfStr(value)
+                location[name] = value
     return
 
 
-def parseReg(obj, location, content):
+def parseReg(obj, location, content, match=None, compact=False, intern=True):
     needsBlank = obj.get("name") and obj.get("names")
     if obj.get("push"):
         if not location.get(obj.get("push")):
@@ -36,41 +102,253 @@ def parseReg(obj, location, content):
         if not location.get(obj.get("name")):
             location[obj.get("name")] = {}
     keyLocation = (
-        {}
+        (records[obj["push"]]() if compact else {})
         if obj.get("push")
         else (location.get(obj.get("name")) if needsBlank else location)
     )
 
+    if match is None:
+        match = obj["reg"].match(content)
     attachProperties(
-        re.match(obj["reg"], content), keyLocation, obj.get("names"), obj.get("name")
+        match,
+        keyLocation,
+        obj.get("names"),
+        obj.get("name"),
+        obj.get("intern") if intern else None,
+        obj.get("convert"),
     )
 
     if obj.get("push"):
         location[obj.get("push")].append(keyLocation)
 
 
-def parse(sdp: str) -> dict:
-    session = {}
-    media = []
-    location = session
-    lines = [line for line in sdp.splitlines() if re.match(r"^([a-z])=(.*)", line)]
+# a rule whose reg starts with a literal "token:" (^rtpmap:, ^rtcp-fb:, ...) can
+# only match lines carrying that token before the first ':'
+tokenReg = re.compile(r"^\^([\w\-]+):")
+# flag rules like ^(rtcp-mux) can only match lines starting with the literal
+flagReg = re.compile(r"^\^\(([\w\-]+)\)")
+
+
+def compileRules(rules):
+    keyed = {}
+    fallback = []
+    for position, obj in enumerate(rules):
+        obj["convert"] = ruleConverters(obj)
+        pattern = obj["reg"].pattern
+        token = tokenReg.match(pattern)
+        flag = flagReg.match(pattern)
+        if token:
+            keyed.setdefault(token[1], []).append((position, token[1] + ":", obj))
+        else:
+            fallback.append((position, flag[1] if flag else "", obj))
+
+    # keep grammar order between keyed rules and the fallback ones, so a line
+    # still hits the same rule as a linear scan over the whole list would
+    index = {
+        token: [(prefix, obj) for _, prefix, obj in sorted(objs + fallback)]
+        for token, objs in keyed.items()
+    }
+    return index, [(prefix, obj) for _, prefix, obj in fallback]
+
+
+compiledGrammar = {field: compileRules(rules) for field, rules in grammar.items()}
+
+
+def parseLine(location, field, content, compact=False, intern=True):
+    rules = compiledGrammar.get(field)
+    if rules is None:
+        return
+    index, fallback = rules
+    for prefix, obj in index.get(content.partition(":")[0], fallback):
+        if content.startswith(prefix):
+            match = obj["reg"].match(content)
+            if match:
+                parseReg(obj, location, content, match, compact, intern)
+                return
+
+
+def parseLineCounted(
+    location, field, content, compact=False, intern=True, stats=None
+):
+    # parseLine() with every regex attempt counted and timed in stats
+    stats.lines[field] = stats.lines.get(field, 0) + 1
+    rules = compiledGrammar.get(field)
+    if rules is not None:
+        index, fallback = rules
+        for prefix, obj in index.get(content.partition(":")[0], fallback):
+            if content.startswith(prefix):
+                rule = stats.rule(ruleName(field, obj))
+                start = perf_counter()
+                match = obj["reg"].match(content)
+                if match:
+                    parseReg(obj, location, content, match, compact, intern)
+                    rule.time += perf_counter() - start
+                    rule.matches += 1
+                    return
+                rule.time += perf_counter() - start
+                rule.failures += 1
+    stats.unmatched[field] = stats.unmatched.get(field, 0) + 1
+
+
+def projectRules(rules, fields):
+    # (prefix, obj, wanted) up to the last rule whose key is in fields, or
+    # None when a line reaching these rules can't end up in a requested key
+    wanted = [(obj.get("name") or obj.get("push")) in fields for _, obj in rules]
+    if True not in wanted:
+        return None
+    last = len(wanted) - wanted[::-1].index(True)
+    return [(prefix, obj, w) for (prefix, obj), w in zip(rules[:last], wanted)]
+
+
+@lru_cache(maxsize=64)
+def compileProjection(fields):
+    # the m-line rule has no key and is always kept: it opens the sections
+    fields = fields | {None}
+    return {
+        field: (
+            {token: projectRules(rules, fields) for token, rules in index.items()},
+            projectRules(fallback, fields),
+        )
+        for field, (index, fallback) in compiledGrammar.items()
+    }
+
+
+def matchProjected(projection, field, content):
+    # (obj, match) of the rule a full parse would pick for the line, if that
+    # is one of the projection's requested rules, else None. Lines no
+    # requested rule can match are dropped after the token lookup, and for the
+    # others the requested rules are tried first. Only when one matches are
+    # the other rules before it checked, since one of those would have taken
+    # the line in a full parse
+    rules = projection.get(field)
+    if rules is None:
+        return None
+    index, fallback = rules
+    rules = index.get(content.partition(":")[0], fallback)
+    if rules is None:
+        return None
+    for i, (prefix, obj, wanted) in enumerate(rules):
+        if wanted and content.startswith(prefix):
+            match = obj["reg"].match(content)
+            if match:
+                for prefix, other, otherWanted in rules[:i]:
+                    if (
+                        not otherWanted
+                        and content.startswith(prefix)
+                        and other["reg"].match(content)
+                    ):
+                        return None
+                return obj, match
+    return None
+
+
+def parseLineProjected(
+    location, field, content, compact=False, intern=True, projection=None
+):
+    # parseLine() restricted to the rules of a projection (see matchProjected)
+    found = matchProjected(projection, field, content)
+    if found is not None:
+        parseReg(found[0], location, content, found[1], compact, intern)
+
+
+def isLine(line):
+    # same filter as ^([a-z])=(.*)
+    return len(line) > 1 and line[1] == "=" and "a" <= line[0] <= "z"
+
+
+def parseSections(lines, compact=False, stats=None, intern=True, fields=None):
+    # yields the session-level dict once the first m= line shows up (or the
+    # input ends), then every media dict as soon as its section is closed
+    if fields is not None:
+        if stats is not None:
+            raise ValueError("stats can't be collected for a projected parse")
+        projection = compileProjection(frozenset(fields))
+        parseOne = partial(parseLineProjected, projection=projection)
+    elif stats is not None:
+        parseOne = partial(parseLineCounted, stats=stats)
+    else:
+        parseOne = parseLine
+    location = {}
     for line in lines:
-        field = line[0]
-        content = line[2:]
+        if not isLine(line):
+            continue
+        if line[0] == "m":
+            yield location
+            location = {"rtp": [], "fmtp": []}
+        parseOne(location, line[0], line[2:], compact, intern)
 
-        if field == "m":
-            media.append({"rtp": [], "fmtp": []})
-            location = media[-1]
+    yield location
 
-        for obj in grammar.get(field, []):
-            if re.match(obj["reg"], content):
-                parseReg(obj, location, content)
-                break
 
-    session["media"] = media
+# SDP is UTF-8 (RFC4566 5.), undecodable bytes survive a parse/write round trip
+sdpEncoding = "utf-8"
+sdpErrors = "surrogateescape"
+
+
+def toText(sdp):
+    # bytes, bytearray and memoryview are decoded in a single pass, straight
+    # from the buffer
+    return sdp if isinstance(sdp, str) else str(sdp, sdpEncoding, sdpErrors)
+
+
+def splitChunks(chunks):
+    # re-cut arbitrary str or bytes chunks (socket reads, file lines) into
+    # lines, holding back a trailing partial line until its end arrives
+    decoder = codecs.getincrementaldecoder(sdpEncoding)(sdpErrors)
+    pending = ""
+    for chunk in chunks:
+        if not isinstance(chunk, str):
+            chunk = decoder.decode(chunk)
+        if not chunk:
+            continue
+        lines = (pending + chunk).splitlines()
+        pending = "" if chunk.endswith(("\n", "\r")) else lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def parse(
+    sdp,
+    compact: bool = False,
+    stats=None,
+    intern: bool = True,
+    fields=None,
+) -> dict:
+    # sdp may be str, bytes, bytearray or memoryview
+    # compact=True stores push entries (candidates, ssrcs, rtp, ...) as slotted
+    # records from records.py instead of dicts
+    # stats, a Stats from stats.py, collects per-rule counts and timings
+    # intern=False skips sharing the values listed in the grammar's "intern"
+    # fields, a set of session/media keys (fingerprint, mid, candidates, ...),
+    # keeps only those keys (plus the m-line ones) and skips the work for the
+    # lines of any other rule
+    sections = parseSections(toText(sdp).splitlines(), compact, stats, intern, fields)
+    session = next(sections)
+    session["media"] = list(sections)
     return session
 
 
+def parseIter(
+    chunks,
+    compact: bool = False,
+    stats=None,
+    intern: bool = True,
+    fields=None,
+    lines: bool = False,
+):
+    # streaming variant of parse(): the first item is the session dict (without
+    # "media"), followed by one dict per m= section in order
+    # lines=True takes each chunk as one whole line, with or without its
+    # terminator (e.g. sdp.splitlines()); otherwise chunks are joined and cut
+    # at line terminators, so chunks lacking them would run together
+    if lines:
+        chunks = (toText(line).rstrip("\r\n") for line in chunks)
+    else:
+        chunks = splitChunks(chunks)
+    return parseSections(chunks, compact, stats, intern, fields)
+
+
 def paramReducer(acc, expr):
     s = expr.split("=", 1)
     if len(s) == 2:
@@ -80,8 +358,14 @@ def paramReducer(acc, expr):
     return acc
 
 
+paramSplitReg = re.compile(r";\s?")
+
+
+# fmtp configs and rid params repeat across sessions, so results are memoized;
+# they are shared between callers and therefore frozen (see frozen.py)
+@lru_cache(maxsize=1024)
 def parseParams(string: str):
-    return reduce(paramReducer, re.split(r";\s?", string), {})
+    return FrozenDict(reduce(paramReducer, paramSplitReg.split(string), {}))
 
 
 def parsePayloads(string: str):
@@ -100,10 +384,12 @@ def parseRemoteCandidates(string: str):
     return candidates
 
 
+@lru_cache(maxsize=1024)
 def parseImageAttributes(string: str):
-    return [
-        reduce(paramReducer, item[1:-1].split(","), {}) for item in string.split(" ")
-    ]
+    return FrozenList(
+        FrozenDict(reduce(paramReducer, item[1:-1].split(","), {}))
+        for item in string.split(" ")
+    )
 
 
 def parseSimulcastStreamList(string: str):
@@ -0,0 +1,75 @@
+from collections.abc import MutableMapping
+
+from .grammar import grammar
+
+
+class Record(MutableMapping):
+    # fixed-shape stand-in for the dicts that push rules append, one slot per
+    # name in the rule; a slot holding None reads as a missing key, the same
+    # way write() treats a None value
+    __slots__ = ()
+    names = ()
+    slots = {}
+
+    def __init__(self, *args, **kwargs):
+        self.update(*args, **kwargs)
+
+    def get(self, key, default=None):
+        slot = self.slots.get(key)
+        value = None if slot is None else getattr(self, slot, None)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = getattr(self, self.slots[key], None)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        setattr(self, self.slots[key], value)
+
+    def __delitem__(self, key):
+        if self.get(key) is None:
+            raise KeyError(key)
+        setattr(self, self.slots[key], None)
+
+    def __iter__(self):
+        for name in self.names:
+            if getattr(self, self.slots[name], None) is not None:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __reduce__(self):
+        return type(self), (self.toDict(),)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.toDict())
+
+    def toDict(self):
+        return {name: self[name] for name in self}
+
+
+def makeRecord(push, names):
+    name = push[0].upper() + push[1:] + "Record"
+    slots = {n: n.replace("-", "_") for n in names}
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": tuple(slots.values()),
+            "__module__": __name__,
+            "names": tuple(names),
+            "slots": slots,
+        },
+    )
+
+
+# one record type per push rule, e.g. CandidatesRecord or SsrcsRecord
+records = {}
+for objs in grammar.values():
+    for obj in objs:
+        if obj.get("push"):
+            records[obj["push"]] = makeRecord(obj["push"], obj["names"])
+            globals()[records[obj["push"]].__name__] = records[obj["push"]]
@@ -0,0 +1,121 @@
+from .grammar import grammar
+from .parser import (
+    attachProperties,
+    compileProjection,
+    isLine,
+    matchProjected,
+    sdpEncoding,
+    sdpErrors,
+    toText,
+)
+from .stats import ruleName
+from .writer import makeRender
+
+
+def splitEnding(line):
+    # (line, terminator) for a line cut by str.splitlines(True)
+    body = line.splitlines()
+    body = body[0] if body else ""
+    return body, line[len(body) :]
+
+
+class RuleHandlers:
+    # the callbacks subscribed to one grammar rule, and how to get the rule's
+    # fields out of a parsed line and render them back
+    __slots__ = ("obj", "render", "callbacks")
+
+    def __init__(self, field, obj):
+        self.obj = obj
+        self.render = makeRender(field, obj)
+        self.callbacks = []
+
+    def decode(self, match):
+        # the dict the callbacks get: what parse() stores as the entry of a
+        # push rule (candidates, ssrcs, ...), under a named group (connection,
+        # fingerprint, ...) or straight in the section for the m-line and
+        # alike, {name: value} for a single value
+        obj = self.obj
+        fields = {}
+        attachProperties(
+            match, fields, obj.get("names"), obj.get("name"), None, obj["convert"]
+        )
+        return fields
+
+    def encode(self, fields):
+        obj = self.obj
+        if obj.get("name") and not obj.get("names"):
+            return self.render(fields[obj["name"]])
+        return self.render(fields)
+
+
+class Rewriter:
+    # rewrites an SDP line by line: on(rule, callback) subscribes a callback to
+    # a grammar rule, named the way Stats names them ("a=candidates",
+    # "c=connection", "m=media", ...). callback(fields, media) gets the
+    # line's decoded fields and the index of its media section (None at
+    # session level), and returns the fields to write or None to drop the
+    # line. Lines of other rules, lines whose fields come back unchanged and
+    # lines no rule matches are copied as they are
+    def __init__(self):
+        self.rules = {}
+        self.fields = frozenset()
+        self.projection = None
+
+    def on(self, rule, callback):
+        found = [
+            (field, obj)
+            for field, rules in grammar.items()
+            for obj in rules
+            if ruleName(field, obj) == rule
+        ]
+        if not found:
+            raise ValueError("unknown rule %r" % rule)
+        for field, obj in found:
+            if id(obj) not in self.rules:
+                self.rules[id(obj)] = RuleHandlers(field, obj)
+            self.rules[id(obj)].callbacks.append(callback)
+        self.fields = self.fields | {field for field, _ in found}
+        keys = {
+            handlers.obj.get("name") or handlers.obj.get("push")
+            for handlers in self.rules.values()
+        }
+        self.projection = compileProjection(frozenset(keys - {None}))
+        return self
+
+    def rewriteLines(self, lines):
+        # lines as cut by str.splitlines(True) (or read from a file opened
+        # with newline=""); yields the output lines, terminators included
+        media = None
+        for line in lines:
+            if not isLine(line):
+                yield line
+                continue
+            field = line[0]
+            if field == "m":
+                media = 0 if media is None else media + 1
+            if field not in self.fields:
+                yield line
+                continue
+            body, ending = splitEnding(line)
+            found = matchProjected(self.projection, field, body[2:])
+            handlers = None if found is None else self.rules.get(id(found[0]))
+            if handlers is None:
+                yield line
+                continue
+            original = handlers.decode(found[1])
+            fields = dict(original)
+            for callback in handlers.callbacks:
+                fields = callback(fields, media)
+                if fields is None:
+                    break
+            if fields is None:
+                continue
+            if fields == original:
+                yield line
+            else:
+                yield handlers.encode(fields) + ending
+
+    def rewrite(self, sdp, asBytes: bool = False):
+        # sdp may be str, bytes, bytearray or memoryview
+        text = "".join(self.rewriteLines(toText(sdp).splitlines(True)))
+        return text.encode(sdpEncoding, sdpErrors) if asBytes else text
@@ -0,0 +1,74 @@
+import mmap
+import os
+import re
+from functools import partial
+
+from .bulk import mapMany
+from .parser import parse
+
+# an SDP body: a v=0 line starting a line, then every x= line right after it
+# up to the next v= line, so back to back bodies still come out one by one
+# and a body is found the same way whatever offset the search starts from
+bodyReg = re.compile(rb"^v=0\r?\n(?:[a-uw-z]=[^\r\n]*(?:\r?\n|\r|\Z))*", re.M)
+
+
+def findBodies(buffer, start=0, end=None):
+    # (offset, body) for every body starting in buffer[start:end]; buffer is
+    # anything the re module can search (bytes, mmap, ...), bodies running
+    # past end are still returned whole
+    end = len(buffer) if end is None else end
+    for match in bodyReg.finditer(buffer, start):
+        if match.start() >= end:
+            return
+        yield match.start(), buffer[match.start() : match.end()]
+
+
+def openMap(path):
+    # None for an empty file, which can't be mapped
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def scanRegion(region, compact=False, fields=None):
+    path, start, end = region
+    buffer = openMap(path)
+    if buffer is None:
+        return []
+    with buffer:
+        return [
+            (offset, parse(body, compact, fields=fields))
+            for offset, body in findBodies(buffer, start, end)
+        ]
+
+
+def scanFile(
+    path,
+    workers: int = 1,
+    regionSize: int = 4 << 20,
+    compact: bool = False,
+    fields=None,
+):
+    # yields (offset, session) for every SDP body in the file at path, which
+    # is memory-mapped rather than read. With workers > 1 the file is cut into
+    # regions of regionSize bytes that worker processes map and scan on their
+    # own; results still come back in file order
+    if workers <= 1:
+        buffer = openMap(path)
+        if buffer is None:
+            return
+        with buffer:
+            for offset, body in findBodies(buffer):
+                yield offset, parse(body, compact, fields=fields)
+        return
+
+    size = os.path.getsize(path)
+    regions = (
+        (path, start, start + regionSize) for start in range(0, size, regionSize)
+    )
+    scan = partial(scanRegion, compact=compact, fields=fields)
+    for sessions, error in mapMany(scan, regions, workers, chunksize=1):
+        if error is not None:
+            raise error
+        yield from sessions
@@ -0,0 +1,153 @@
+from collections.abc import Mapping, MutableMapping, MutableSequence
+
+from .parser import parse
+
+
+class TrackedDict(MutableMapping):
+    # dict stand-in that reports every change up to its owner; as an entry of
+    # a push list it also keeps the line write() last rendered for it
+    __slots__ = ("data", "owner", "key", "rendered")
+
+    def __init__(self, data=(), owner=None, key=None):
+        self.owner = owner
+        self.key = key
+        self.rendered = None
+        self.data = {}
+        for k, v in dict(data).items():
+            self.data[k] = self.wrap(k, v)
+
+    def wrap(self, key, value):
+        if isinstance(value, Mapping):
+            return TrackedDict(value, self, key)
+        if isinstance(value, list):
+            return TrackedList(value, self, key)
+        return value
+
+    def changed(self, key=None):
+        self.rendered = None
+        if self.owner is not None:
+            self.owner.changed(self.key)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        self.data[key] = self.wrap(key, value)
+        self.changed(key)
+
+    def __delitem__(self, key):
+        del self.data[key]
+        self.changed(key)
+
+    def setdefault(self, key, default=None):
+        # returns the stored (wrapped) value: like assignment, storing a dict
+        # or list copies it, so later changes to default itself go unseen
+        if key not in self.data:
+            self[key] = default
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.data)
+
+    def toDict(self):
+        return {k: toPlain(v) for k, v in self.data.items()}
+
+
+class TrackedSection(TrackedDict):
+    # the session or one media section: besides the rendered lines per key it
+    # keeps the whole section as last written, until something in it changes
+    __slots__ = ("lines", "plan", "text")
+
+    def __init__(self, data=(), owner=None, key=None):
+        self.lines = {}
+        self.plan = None
+        self.text = None
+        super().__init__(data, owner, key)
+
+    def wrap(self, key, value):
+        if key == "media" and self.owner is None and isinstance(value, list):
+            return TrackedList(value, self, key, TrackedSection)
+        return super().wrap(key, value)
+
+    def changed(self, key=None):
+        if key == "media" and self.owner is None:
+            return  # media sections keep their own caches
+        self.lines.pop(key, None)
+        self.text = None
+        if self.owner is not None:
+            self.owner.changed(self.key)
+
+
+class TrackedList(MutableSequence):
+    __slots__ = ("data", "owner", "key", "itemType")
+
+    def __init__(self, items=(), owner=None, key=None, itemType=TrackedDict):
+        self.owner = owner
+        self.key = key
+        self.itemType = itemType
+        self.data = [self.wrap(item) for item in items]
+
+    def wrap(self, item):
+        if isinstance(item, Mapping):
+            return self.itemType(item, self)
+        return item
+
+    def changed(self, key=None):
+        if self.owner is not None:
+            self.owner.changed(self.key)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            self.data[index] = [self.wrap(i) for i in item]
+        else:
+            self.data[index] = self.wrap(item)
+        self.changed()
+
+    def __delitem__(self, index):
+        del self.data[index]
+        self.changed()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, TrackedList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.data)
+
+    def insert(self, index, item):
+        self.data.insert(index, self.wrap(item))
+        self.changed()
+
+    def toList(self):
+        return [toPlain(item) for item in self.data]
+
+
+def toPlain(value):
+    if isinstance(value, TrackedDict):
+        return value.toDict()
+    if isinstance(value, TrackedList):
+        return value.toList()
+    return value
+
+
+def track(session):
+    # wraps a session dict (e.g. from parse()) so that write() only re-renders
+    # what changed since the previous write
+    return TrackedSection(session)
+
+
+def parseEditable(sdp) -> TrackedSection:
+    return track(parse(sdp))
@@ -0,0 +1,75 @@
+from time import perf_counter
+
+
+def ruleName(field, obj):
+    # "a=rtp", "a=candidates", "o=origin", ...; the m-line rule has no key
+    return field + "=" + (obj.get("name") or obj.get("push") or "media")
+
+
+class RuleStats:
+    __slots__ = ("matches", "failures", "time")
+
+    def __init__(self):
+        self.matches = 0
+        self.failures = 0
+        self.time = 0.0
+
+    def toDict(self):
+        return {"matches": self.matches, "failures": self.failures, "time": self.time}
+
+    def __repr__(self):
+        return "RuleStats(matches=%d, failures=%d, time=%.6f)" % (
+            self.matches,
+            self.failures,
+            self.time,
+        )
+
+
+class Stats:
+    # filled in by parse(sdp, stats=...) and write(session, stats=...); one
+    # instance can be passed to any number of calls and keeps adding up.
+    #   lines      field -> lines parsed
+    #   unmatched  field -> lines no rule of the field matched (dropped)
+    #   rules      rule -> RuleStats: matches, failed regex attempts before a
+    #              match (or before giving up) and seconds spent in the rule
+    #   writes     rule -> RuleStats: lines rendered and seconds spent
+    # Lines ending up in media "invalid" are the matches of rule "a=invalid"
+    def __init__(self):
+        self.lines = {}
+        self.unmatched = {}
+        self.rules = {}
+        self.writes = {}
+
+    def rule(self, name):
+        stats = self.rules.get(name)
+        if stats is None:
+            stats = self.rules[name] = RuleStats()
+        return stats
+
+    def timedRender(self, name, render):
+        stats = self.writes.get(name)
+        if stats is None:
+            stats = self.writes[name] = RuleStats()
+
+        def timed(value):
+            start = perf_counter()
+            line = render(value)
+            stats.time += perf_counter() - start
+            stats.matches += 1
+            return line
+
+        return timed
+
+    def toDict(self):
+        return {
+            "lines": dict(self.lines),
+            "unmatched": dict(self.unmatched),
+            "rules": {name: s.toDict() for name, s in self.rules.items()},
+            "writes": {name: s.toDict() for name, s in self.writes.items()},
+        }
+
+    def clear(self):
+        self.lines.clear()
+        self.unmatched.clear()
+        self.rules.clear()
+        self.writes.clear()
@@ -0,0 +1,118 @@
+from collections.abc import Mapping
+from operator import itemgetter
+
+from .frozen import thaw
+from .grammar import grammar
+from .parser import parse, sdpEncoding, sdpErrors
+from .writer import defaultInnerOrder, defaultOuterOrder, getPlan, renderMLine
+
+missing = object()
+mLineNames = grammar["m"][0]["names"]
+
+
+def lookup(values, index, key):
+    # a media section's own value first, then one shared by the whole session
+    if index is not None:
+        media = values.get("media")
+        if media is not None and index < len(media) and key in media[index]:
+            return media[index][key]
+    return values.get(key, missing)
+
+
+def renderLines(value, push, render):
+    if value is None:
+        return ""
+    if push:
+        return "".join(render(el) + "\r\n" for el in value)
+    return render(value) + "\r\n"
+
+
+def slotPart(index, key, push, render, default):
+    def part(values):
+        value = lookup(values, index, key)
+        if value is missing:
+            return default
+        return renderLines(value, push, render)
+
+    return part
+
+
+def mLinePart(index, media):
+    def part(values):
+        mLine = {}
+        for name in mLineNames:
+            value = lookup(values, index, name)
+            mLine[name] = media.get(name) if value is missing else value
+        return renderMLine(mLine) + "\r\n"
+
+    return part
+
+
+def sectionParts(location, plan, slots, index):
+    # (rank, str) for static lines, (rank, part) for slot lines; slots only
+    # exist where the template itself has a value for the key
+    parts = []
+    for key, rules in plan.items():
+        value = location.get(key)
+        if value is None:
+            continue
+        for rank, push, render in rules:
+            text = renderLines(value, push, render)
+            if key in slots:
+                parts.append((rank, slotPart(index, key, push, render, text)))
+            else:
+                parts.append((rank, text))
+    parts.sort(key=itemgetter(0))
+    return [part for _, part in parts]
+
+
+class Template:
+    def __init__(self, parts):
+        # adjacent static lines are joined once, up front
+        self.parts = []
+        for part in parts:
+            if part == "":
+                continue
+            if isinstance(part, str) and self.parts and isinstance(self.parts[-1], str):
+                self.parts[-1] += part
+            else:
+                self.parts.append(part)
+
+    def render(self, values=None, asBytes: bool = False):
+        # values holds the slot values shared by all sections, plus an
+        # optional "media" list of per-section values; a slot without a value
+        # keeps the one from the template
+        values = values or {}
+        sdp = "".join(
+            part if isinstance(part, str) else part(values) for part in self.parts
+        )
+        return sdp.encode(sdpEncoding, sdpErrors) if asBytes else sdp
+
+
+def compileTemplate(
+    session,
+    slots=(),
+    outerOrder: list = defaultOuterOrder,
+    innerOrder: list = defaultInnerOrder,
+) -> Template:
+    # session is a parsed session or the SDP itself; slots are the keys
+    # (iceUfrag, fingerprint, candidates, ...) or m-line fields (port, ...)
+    # filled in on every render(), everything else is rendered here once
+    session = thaw(session) if isinstance(session, Mapping) else parse(session)
+    if session.get("version") is None:
+        session["version"] = 0
+    if session.get("name") is None:
+        session["name"] = " "
+    slots = set(slots)
+
+    parts = sectionParts(session, getPlan(outerOrder), slots, None)
+    innerPlan = getPlan(innerOrder)
+    for index, media in enumerate(session.get("media", [])):
+        if media.get("payloads") is None:
+            media["payloads"] = ""
+        if slots.intersection(mLineNames):
+            parts.append(mLinePart(index, media))
+        else:
+            parts.append(renderMLine(media) + "\r\n")
+        parts.extend(sectionParts(media, innerPlan, slots, index))
+    return Template(parts)
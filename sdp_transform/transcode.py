@@ -0,0 +1,137 @@
+from json import dumps, loads
+from json.encoder import encode_basestring_ascii
+
+from .parser import compiledGrammar, isLine, sdpEncoding, toText
+from .writer import defaultInnerOrder, defaultOuterOrder, write
+
+
+def encodeValue(v):
+    # the way json.dumps writes a value parse() produces (str, int or float)
+    if type(v) is str:
+        return encode_basestring_ascii(v)
+    if type(v) is int:
+        return int.__repr__(v)
+    return dumps(v)
+
+
+def encoder(converter):
+    # matched text -> JSON text of the value parse() would store for it
+    if converter is None:
+        return encode_basestring_ascii
+    return lambda v: encodeValue(converter(v))
+
+
+def makeApply(obj):
+    # returns apply(fields, match), storing the rule's encoded values in the
+    # section's fields the same way parseReg() stores them in the dict:
+    # JSON text for a single value, list of encoded entries for a push rule,
+    # dict of JSON texts for a named group, at the same key positions
+    push = obj.get("push")
+    name = obj.get("name")
+    names = obj.get("names") or [name]
+    encoders = [encoder(converter) for converter in obj["convert"]]
+    pairs = list(zip(names, encoders))
+
+    if push:
+        keys = [(encode_basestring_ascii(n) + ": ", encode) for n, encode in pairs]
+
+        def apply(fields, match):
+            entry = "{%s}" % ", ".join(
+                [
+                    key + encode(value)
+                    for (key, encode), value in zip(keys, match.groups())
+                    if value is not None
+                ]
+            )
+            if not fields.get(push):
+                fields[push] = []
+            fields[push].append(entry)
+
+    elif obj.get("names"):
+
+        def apply(fields, match):
+            location = fields
+            if name:
+                if not fields.get(name):
+                    fields[name] = {}
+                location = fields[name]
+            for (n, encode), value in zip(pairs, match.groups()):
+                if value is not None:
+                    location[n] = encode(value)
+
+    else:
+        encode = encoders[0]
+
+        def apply(fields, match):
+            value = match[1]
+            fields[name] = "null" if value is None else encode(value)
+
+    return apply
+
+
+jsonGrammar = {
+    field: (
+        {
+            token: [(prefix, obj, makeApply(obj)) for prefix, obj in rules]
+            for token, rules in index.items()
+        },
+        [(prefix, obj, makeApply(obj)) for prefix, obj in fallback],
+    )
+    for field, (index, fallback) in compiledGrammar.items()
+}
+
+
+def encodeFields(fields, media=None):
+    parts = []
+    for key, value in fields.items():
+        if type(value) is list:
+            value = "[%s]" % ", ".join(value)
+        elif type(value) is dict:
+            value = "{%s}" % ", ".join(
+                [encode_basestring_ascii(k) + ": " + v for k, v in value.items()]
+            )
+        parts.append(encode_basestring_ascii(key) + ": " + value)
+    if media is not None:
+        parts.append('"media": [%s]' % ", ".join(media))
+    return "{%s}" % ", ".join(parts)
+
+
+def toJson(sdp, asBytes: bool = False):
+    # json.dumps(parse(sdp)), byte for byte, without building the session:
+    # matched values are encoded straight away and every section is kept as
+    # a flat key -> JSON text mapping until it is joined
+    session = fields = {}
+    media = []
+    for line in toText(sdp).splitlines():
+        if not isLine(line):
+            continue
+        field = line[0]
+        if field == "m":
+            if fields is not session:
+                media.append(encodeFields(fields))
+            fields = {"rtp": [], "fmtp": []}
+        rules = jsonGrammar.get(field)
+        if rules is None:
+            continue
+        content = line[2:]
+        index, fallback = rules
+        for prefix, obj, apply in index.get(content.partition(":")[0], fallback):
+            if content.startswith(prefix):
+                match = obj["reg"].match(content)
+                if match:
+                    apply(fields, match)
+                    break
+    if fields is not session:
+        media.append(encodeFields(fields))
+    text = encodeFields(session, media)
+    return text.encode(sdpEncoding) if asBytes else text
+
+
+def fromJson(
+    text,
+    outerOrder: list = defaultOuterOrder,
+    innerOrder: list = defaultInnerOrder,
+    asBytes: bool = False,
+):
+    # write(json.loads(text)); text may be str or bytes
+    return write(loads(text), outerOrder, innerOrder, asBytes)
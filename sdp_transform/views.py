@@ -0,0 +1,402 @@
+from abc import abstractmethod
+from collections.abc import Mapping
+
+from .parser import parseParams, parseSections, toIntIfInt, toText
+
+
+class Codec:
+    # one payload type of a media section: its rtpmap, fmtp and rtcp-fb
+    # entries; the fields read through to those entries, so editing them in
+    # place shows up here. placed lists them for CodecIndex to check
+    __slots__ = (
+        "payload",
+        "rtp",
+        "fmtp",
+        "rtcpFb",
+        "rtcpFbTrrInt",
+        "parsed",
+        "placed",
+    )
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.rtp = None
+        self.fmtp = None
+        self.rtcpFb = []
+        self.rtcpFbTrrInt = []
+        self.parsed = None
+        self.placed = []
+
+    @property
+    def codec(self):
+        return None if self.rtp is None else self.rtp.get("codec")
+
+    @property
+    def rate(self):
+        return None if self.rtp is None else self.rtp.get("rate")
+
+    @property
+    def encoding(self):
+        return None if self.rtp is None else self.rtp.get("encoding")
+
+    @property
+    def config(self):
+        return None if self.fmtp is None else self.fmtp.get("config")
+
+    @property
+    def params(self):
+        # parseParams(config), decoded on first use and again only once the
+        # config string changes
+        config = self.config
+        if config is None:
+            return {}
+        if self.parsed is None or self.parsed[0] != config:
+            self.parsed = (config, parseParams(config))
+        return self.parsed[1]
+
+    def __repr__(self):
+        return "Codec(%r, %r/%r, config=%r)" % (
+            self.payload,
+            self.codec,
+            self.rate,
+            self.config,
+        )
+
+
+class ListIndex(Mapping):
+    # a view over some of a media section's (or the session's) lists, rebuilt
+    # in one pass over them whenever one was replaced, grew or shrank (or, for
+    # the keys in watched, got a different value). For the lists in keyed,
+    # every entry and the field it is indexed by count as well, so swapping
+    # an entry or editing that field is picked up too; for the other lists
+    # that needs a refresh()
+    lists = ()
+    keyed = {}
+    watched = ()
+
+    def __init__(self, location):
+        self.location = location
+        self.signature = None
+        self.entries = {}
+
+    def listSignature(self, key):
+        entries = self.location.get(key)
+        if entries is None:
+            return None
+        field = self.keyed.get(key)
+        if field is None:
+            return id(entries), len(entries)
+        return tuple([(id(entry), entry.get(field)) for entry in entries])
+
+    def currentSignature(self):
+        location = self.location
+        return tuple(location.get(key) for key in self.watched) + tuple(
+            self.listSignature(key) for key in self.lists
+        )
+
+    @abstractmethod
+    def build(self):
+        pass
+
+    def refresh(self):
+        self.entries = self.build()
+        self.signature = self.currentSignature()
+
+    def current(self):
+        if self.signature != self.currentSignature():
+            self.refresh()
+        return self.entries
+
+    def __getitem__(self, key):
+        return self.current()[key]
+
+    def __iter__(self):
+        return iter(self.current())
+
+    def __len__(self):
+        return len(self.current())
+
+
+class PlacedIndex(ListIndex):
+    # a ListIndex whose items record in placed the entries they were built
+    # from, as (list, position, entry, field, value). A hit checks that the
+    # item's entries are still in place and hold the value they were indexed
+    # by, in O(its entries); a miss, iterating and len() check every item
+    def moved(self, item):
+        location = self.location
+        for key, position, entry, field, value in item.placed:
+            entries = location.get(key) or ()
+            if (
+                position >= len(entries)
+                or entries[position] is not entry
+                or entry.get(field) != value
+            ):
+                return True
+        return False
+
+    def verified(self):
+        items = self.current()
+        if any(self.moved(item) for item in items.values()):
+            self.refresh()
+        return self.entries
+
+    def __getitem__(self, key):
+        item = self.current().get(key)
+        if item is None:
+            return self.verified()[key]
+        if self.moved(item):
+            self.refresh()
+            return self.entries[key]
+        return item
+
+    def __iter__(self):
+        return iter(self.verified())
+
+    def __len__(self):
+        return len(self.verified())
+
+
+class CodecIndex(PlacedIndex):
+    # payload type -> Codec, in m-line order. Other edits that keep the lists'
+    # length (a new entry for a payload in place of another's duplicate, ...)
+    # need a refresh()
+    lists = ("rtp", "fmtp", "rtcpFb", "rtcpFbTrrInt")
+    watched = ("payloads",)
+
+    def build(self):
+        media = self.location
+        codecs = {}
+        for payload in str(media.get("payloads") or "").split():
+            payload = toIntIfInt(payload)
+            codecs[payload] = Codec(payload)
+
+        def codecFor(entry):
+            payload = entry.get("payload")
+            codec = codecs.get(payload)
+            if codec is None:
+                codec = codecs[payload] = Codec(payload)
+            return codec
+
+        for key in ("rtp", "fmtp"):
+            for position, entry in enumerate(media.get(key) or []):
+                codec = codecFor(entry)
+                if getattr(codec, key) is None:
+                    setattr(codec, key, entry)
+                    placed = (key, position, entry, "payload", codec.payload)
+                    codec.placed.append(placed)
+        wildcard = {"rtcpFb": [], "rtcpFbTrrInt": []}
+        for key in wildcard:
+            for position, entry in enumerate(media.get(key) or []):
+                if entry.get("payload") == "*":
+                    wildcard[key].append((position, entry))
+                else:
+                    codec = codecFor(entry)
+                    getattr(codec, key).append(entry)
+                    placed = (key, position, entry, "payload", codec.payload)
+                    codec.placed.append(placed)
+        # a=rtcp-fb:* applies to every payload type of the section
+        for codec in codecs.values():
+            for key, entries in wildcard.items():
+                for position, entry in entries:
+                    getattr(codec, key).append(entry)
+                    codec.placed.append((key, position, entry, "payload", "*"))
+        return codecs
+
+
+class Source:
+    # one SSRC of a media section: the a=ssrc entries and the ssrc-group
+    # entries it belongs to; attributes and its shortcuts read through to the
+    # entries, so editing an attribute's value in place shows up here
+    __slots__ = ("id", "entries", "groups", "placed")
+
+    def __init__(self, id):
+        self.id = id
+        self.entries = []
+        self.groups = []
+        self.placed = []
+
+    @property
+    def attributes(self):
+        # attribute name -> value, None for an attribute without value
+        return {
+            entry["attribute"]: entry.get("value")
+            for entry in self.entries
+            if entry.get("attribute") is not None
+        }
+
+    def attribute(self, name):
+        for entry in self.entries:
+            if entry.get("attribute") == name:
+                return entry.get("value")
+        return None
+
+    @property
+    def cname(self):
+        return self.attribute("cname")
+
+    @property
+    def msid(self):
+        return self.attribute("msid")
+
+    @property
+    def label(self):
+        return self.attribute("label")
+
+    def __repr__(self):
+        return "Source(%r, %r, groups=%r)" % (
+            self.id,
+            self.attributes,
+            [group.get("semantics") for group in self.groups],
+        )
+
+
+class SsrcIndex(PlacedIndex):
+    # ssrc -> Source, in order of first appearance. Other edits that keep the
+    # lists' length (a group's ssrcs edited to add an ssrc, ...) need a
+    # refresh()
+    lists = ("ssrcs", "ssrcGroups")
+
+    def build(self):
+        media = self.location
+        sources = {}
+
+        def sourceFor(ssrc):
+            source = sources.get(ssrc)
+            if source is None:
+                source = sources[ssrc] = Source(ssrc)
+            return source
+
+        for position, entry in enumerate(media.get("ssrcs") or []):
+            source = sourceFor(entry.get("id"))
+            source.entries.append(entry)
+            source.placed.append(("ssrcs", position, entry, "id", source.id))
+        for position, group in enumerate(media.get("ssrcGroups") or []):
+            ssrcs = group.get("ssrcs")
+            for ssrc in str(ssrcs or "").split():
+                source = sourceFor(toIntIfInt(ssrc))
+                source.groups.append(group)
+                source.placed.append(("ssrcGroups", position, group, "ssrcs", ssrcs))
+        return sources
+
+
+class MidIndex(ListIndex):
+    # mid -> media section of a session, plus the a=group entries (BUNDLE,
+    # LS, ...) each mid belongs to. Adding or removing sections, and any edit
+    # of the groups, is picked up by the signature. A lookup that misses, or
+    # hits a section that has moved or changed its mid, compares the sections'
+    # mids with the ones indexed and rebuilds if they differ, so an edit
+    # keeping the number of sections is found as well
+    lists = ("media", "groups")
+    keyed = {"groups": "mids"}
+
+    def __init__(self, session):
+        super().__init__(session)
+        self.positions = {}
+        self.groups = {}
+        self.mids = ()
+
+    def add(self, position, media):
+        mid = media.get("mid")
+        if mid is not None and mid not in self.positions:
+            self.entries[mid] = media
+            self.positions[mid] = position
+
+    def indexGroups(self):
+        # mid -> [(group, first mid of the group)]
+        groups = {}
+        for group in self.location.get("groups") or []:
+            mids = [toIntIfInt(mid) for mid in str(group.get("mids") or "").split()]
+            for mid in mids:
+                groups.setdefault(mid, []).append((group, mids[0]))
+        self.groups = groups
+
+    def sectionMids(self):
+        return tuple([media.get("mid") for media in self.location.get("media") or []])
+
+    def build(self):
+        self.entries = {}
+        self.positions = {}
+        for position, media in enumerate(self.location.get("media") or []):
+            self.add(position, media)
+        self.indexGroups()
+        self.mids = self.sectionMids()
+        return self.entries
+
+    def verified(self):
+        # current(), checked against the mids the sections hold now
+        self.current()
+        if self.mids != self.sectionMids():
+            self.refresh()
+        return self.entries
+
+    def position(self, mid):
+        # index of the section in session["media"], None for an unknown mid
+        self.current()
+        position = self.positions.get(mid)
+        media = self.location.get("media") or []
+        if (
+            position is None
+            or position >= len(media)
+            or media[position].get("mid") != mid
+        ):
+            self.verified()
+            position = self.positions.get(mid)
+        return position
+
+    def __getitem__(self, mid):
+        position = self.position(mid)
+        if position is None:
+            raise KeyError(mid)
+        return self.location["media"][position]
+
+    def groupEntry(self, mid, semantics):
+        self.current()
+        for entry in self.groups.get(mid, ()):
+            if entry[0].get("type") == semantics:
+                return entry
+        return None
+
+    def group(self, mid, semantics="BUNDLE"):
+        # the first a=group of that type listing mid, or None
+        entry = self.groupEntry(mid, semantics)
+        return None if entry is None else entry[0]
+
+    def bundleOwner(self, mid):
+        # the section carrying the transport of mid's BUNDLE group: the one
+        # of its first mid (RFC 8843 7.2), or None when mid isn't bundled
+        entry = self.groupEntry(mid, "BUNDLE")
+        return None if entry is None else self.get(entry[1])
+
+    def __iter__(self):
+        return iter(self.verified())
+
+    def __len__(self):
+        return len(self.verified())
+
+
+def mediaCodecs(media) -> CodecIndex:
+    return CodecIndex(media)
+
+
+def mediaSsrcs(media) -> SsrcIndex:
+    return SsrcIndex(media)
+
+
+def sessionMids(session) -> MidIndex:
+    return MidIndex(session)
+
+
+def parseIndexed(sdp, compact: bool = False, intern: bool = True):
+    # parse() returning (session, MidIndex), the index being filled in as the
+    # parser hands out the sections rather than by a second scan
+    sections = parseSections(toText(sdp).splitlines(), compact, intern=intern)
+    session = next(sections)
+    session["media"] = media = []
+    index = MidIndex(session)
+    for section in sections:
+        index.add(len(media), section)
+        media.append(section)
+    index.indexGroups()
+    index.mids = index.sectionMids()
+    index.signature = index.currentSignature()
+    return session, index
@@ -1,29 +1,163 @@
+from operator import itemgetter
+
 from .grammar import grammar
+from .lazy import rawLines
+from .parser import sdpEncoding, sdpErrors
+from .session import TrackedDict, TrackedSection
+from .stats import ruleName
+
+
+def makeRender(field, obj):
+    # returns a function turning the value stored under the rule's key (or the
+    # m-line's media dict) into its SDP line, with the format already bound
+    prefix = field + "="
+    fmt = obj["format"]
+    names = obj.get("names")
+
+    if names:
+
+        def args(value):
+            return tuple([v for v in map(value.get, names) if v is not None])
+
+    else:
+
+        def args(value):
+            return (value,)
+
+    if callable(fmt):
 
+        def render(value):
+            return prefix + fmt(value) % args(value)
 
-def makeLine(field, obj, location):
-    string = (
-        field
-        + "="
-        + (
-            obj["format"]((location if obj.get("push") else location[obj.get("name")]))
-            if callable(obj["format"])
-            else obj["format"]
-        )
-    )
-    args = []
-    if obj.get("names"):
-        for name in obj.get("names"):
-            if obj.get("name"):
-                if location[obj.get("name")].get(name) is not None:
-                    args.append(location[obj.get("name")][name])
-            else:
-                if location.get(name) is not None:
-                    args.append(location[name])
     else:
-        args.append(location[obj.get("name")])
 
-    return string % tuple(args)
+        def render(value):
+            return prefix + fmt % args(value)
+
+    return render
+
+
+def compilePlan(order, stats=None):
+    # key -> [(rank, push, render)], rank being the line's place in the
+    # output: field position in order first, grammar position second
+    plan = {}
+    rank = 0
+    for field in order:
+        for obj in grammar[field]:
+            key = obj.get("name") or obj.get("push")
+            if key:
+                render = makeRender(field, obj)
+                if stats is not None:
+                    render = stats.timedRender(ruleName(field, obj), render)
+                plan.setdefault(key, []).append((rank, bool(obj.get("push")), render))
+            rank += 1
+    return plan
+
+
+plans = {}
+
+
+def getPlan(order, stats=None):
+    # instrumented plans are built per call, never cached
+    if stats is not None:
+        return compilePlan(order, stats)
+    key = tuple(order)
+    plan = plans.get(key)
+    if plan is None:
+        plan = plans[key] = compilePlan(order)
+    return plan
+
+
+# lines every session has to carry, written when the session has no value
+sessionDefaults = {
+    "version": 0,  # 'v=0' must be there (only defined version atm)
+    "name": " ",  # 's= ' must be there if no meaningful name set
+}
+
+
+def defaultLines(location, plan, defaults):
+    return [
+        (rank, [render(value)])
+        for key, value in defaults.items()
+        if location.get(key) is None
+        for rank, _, render in plan.get(key, ())
+    ]
+
+
+def writeSection(location, plan, sdp, defaults=None):
+    # only the keys present in the section are looked at, then put back into
+    # grammar order
+    lines = defaultLines(location, plan, defaults) if defaults else []
+    for key in location:
+        rules = plan.get(key)
+        if rules is None:
+            continue
+        value = location[key]
+        if value is None:
+            continue
+        for rank, push, render in rules:
+            rendered = [render(el) for el in value] if push else [render(value)]
+            lines.append((rank, rendered))
+    lines.sort(key=itemgetter(0))
+    for _, rendered in lines:
+        sdp.extend(rendered)
+
+
+def renderEntry(render, el):
+    if isinstance(el, TrackedDict):
+        if el.rendered is None:
+            el.rendered = render(el)
+        return el.rendered
+    return render(el)
+
+
+def writeTracked(location, plan, sdp, head=None, defaults=None):
+    # a TrackedSection keeps what it rendered last time: an unchanged section
+    # is copied over, otherwise only the keys changed since are rendered again
+    if location.plan is not plan:
+        location.plan = plan
+        location.lines = {}
+        location.text = None
+    if location.text is None:
+        lines = defaultLines(location, plan, defaults) if defaults else []
+        for key in location:
+            cached = location.lines.get(key)
+            if cached is None:
+                rules = plan.get(key)
+                value = location[key]
+                if rules is None or value is None:
+                    continue
+                cached = location.lines[key] = [
+                    (
+                        rank,
+                        [renderEntry(render, el) for el in value]
+                        if push
+                        else [render(value)],
+                    )
+                    for rank, push, render in rules
+                ]
+            lines.extend(cached)
+        lines.sort(key=itemgetter(0))
+        text = [head(location)] if head else []
+        for _, rendered in lines:
+            text.extend(rendered)
+        location.text = text
+    sdp.extend(location.text)
+
+
+renderMLine = makeRender("m", grammar["m"][0])
+
+
+def withPayloads(render):
+    # an m-line without payloads is written with an empty list, the media
+    # section itself is left alone
+    def renderHead(media):
+        if media.get("payloads") is None:
+            media = {name: media.get(name) for name in ("type", "port", "protocol")}
+            media["payloads"] = ""
+        return render(media)
+
+    return renderHead
 
 
 defaultOuterOrder = ["v", "o", "s", "i", "u", "e", "p", "c", "b", "t", "r", "z", "a"]
@@ -35,45 +169,55 @@ def write(
     session: dict,
     outerOrder: list = defaultOuterOrder,
     innerOrder: list = defaultInnerOrder,
+    asBytes: bool = False,
+    stats=None,
 ):
-    if session.get("version") is None:
-        session["version"] = 0  # 'v=0' must be there (only defined version atm)
-    if session.get("name") is None:
-        session["name"] = " "  # 's= ' must be there if no meaningful name set
-
-    for media in session.get("media", []):
-        if media.get("payloads") is None:
-            media["payloads"] = ""
-
+    # the session is only read: missing version, name and m-line payloads are
+    # filled in on the output, so frozen or shared sessions can be written
+    # stats, a Stats from stats.py, collects per-rule line counts and timings
+    sessionLines = rawLines(session)
     sdp = []
 
     # loop through outerOrder for matching properties on session
-    for field in outerOrder:
-        for obj in grammar[field]:
-            if obj.get("name"):
-                if obj["name"] in session.keys():
-                    if session.get(obj["name"]) is not None:
-                        sdp.append(makeLine(field, obj, session))
-            elif obj.get("push"):
-                if obj["push"] in session.keys():
-                    if session.get(obj["push"]) is not None:
-                        for el in session.get(obj["push"]):
-                            sdp.append(makeLine(field, obj, el))
+    # (a lazily parsed section nobody has decoded is copied over as is)
+    if sessionLines is not None:
+        sdp.extend(sessionLines)
+    elif isinstance(session, TrackedSection):
+        writeTracked(session, getPlan(outerOrder, stats), sdp, None, sessionDefaults)
+    else:
+        writeSection(session, getPlan(outerOrder, stats), sdp, sessionDefaults)
 
     # then for each media line, follow the innerOrder
+    innerPlan = getPlan(innerOrder, stats)
+    render = renderMLine
+    if stats is not None:
+        render = stats.timedRender(ruleName("m", grammar["m"][0]), renderMLine)
+    render = withPayloads(render)
     for mLine in session.get("media", []):
-        sdp.append(makeLine("m", grammar["m"][0], mLine))
-
-        for field in innerOrder:
-            for obj in grammar[field]:
-                if obj.get("name"):
-                    if obj["name"] in mLine.keys():
-                        if mLine.get(obj["name"]) is not None:
-                            sdp.append(makeLine(field, obj, mLine))
-                elif obj.get("push"):
-                    if obj["push"] in mLine.keys():
-                        if mLine.get(obj["push"]) is not None:
-                            for el in mLine.get(obj["push"]):
-                                sdp.append(makeLine(field, obj, el))
-
-    return "\r\n".join([*sdp, ""])
+        mediaLines = rawLines(mLine)
+        if mediaLines is not None:
+            sdp.extend(mediaLines)
+            continue
+        if isinstance(mLine, TrackedSection):
+            writeTracked(mLine, innerPlan, sdp, render)
+            continue
+
+        sdp.append(render(mLine))
+        writeSection(mLine, innerPlan, sdp)
+
+    sdp = "\r\n".join([*sdp, ""])
+    return sdp.encode(sdpEncoding, sdpErrors) if asBytes else sdp
+
+
+def writeInto(
+    buffer: bytearray,
+    session: dict,
+    outerOrder: list = defaultOuterOrder,
+    innerOrder: list = defaultInnerOrder,
+    stats=None,
+):
+    # appends the encoded SDP to buffer (e.g. right after the SIP headers) and
+    # returns the number of bytes added
+    size = len(buffer)
+    buffer += write(session, outerOrder, innerOrder, asBytes=True, stats=stats)
+    return len(buffer) - size
@@ -1,13 +1,47 @@
+import json
 import os
+import pickle
+import tempfile
+from contextlib import redirect_stdout
+from copy import deepcopy
+from io import StringIO
 import unittest
 
 from sdp_transform import (
+    ParseCache,
+    Rewriter,
+    Stats,
+    applyPatch,
+    compileTemplate,
+    diff,
+    evolve,
+    freeze,
+    fromJson,
+    mediaCodecs,
+    mediaSsrcs,
     parse,
+    parseCandidate,
+    parseIndexed,
+    parseIter,
+    parseLazy,
+    parseMany,
+    parseEditable,
     write,
+    writeCandidate,
+    writeInto,
+    writeMany,
     parseParams,
     parseImageAttributes,
     parseSimulcastStreamList,
+    replace,
+    scanFile,
+    sessionMids,
+    thaw,
+    toJson,
 )
+from sdp_transform.bulk import main, readInputs
+from sdp_transform.grammar import grammar
+from sdp_transform.parser import compiledGrammar, convertNumber, toIntIfInt
 
 
 class TestMethods(unittest.TestCase):
@@ -22,6 +56,623 @@ class TestMethods(unittest.TestCase):
                     sdp_dict_2 = parse(sdpStr)
                     self.assertDictEqual(sdp_dict_1, sdp_dict_2)
 
+    def test_parse_iter(self):
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                    chunks = [sdp[i : i + 7] for i in range(0, len(sdp), 7)]
+                    session, *media = parseIter(chunks)
+                    session["media"] = media
+                    self.assertDictEqual(session, parse(sdp))
+                    session, *media = parseIter(sdp.splitlines(), lines=True)
+                    session["media"] = media
+                    self.assertDictEqual(session, parse(sdp))
+
+    def test_parse_lazy(self):
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                    sdp_dict = parse(sdp)
+                    lazy = parseLazy(sdp)
+                    self.assertDictEqual(parse(write(lazy)), sdp_dict)
+                    self.assertDictEqual(dict(lazy), sdp_dict)
+                    for media, expected in zip(lazy["media"], sdp_dict["media"]):
+                        self.assertDictEqual(dict(media), expected)
+
+        with open("tests/sdps/normal.sdp") as f:
+            sdp = f.read()
+        lazy = parseLazy(sdp)
+        self.assertEqual(lazy["media"][0]["type"], "audio")
+        self.assertFalse(lazy.decoded)
+        self.assertFalse(lazy["media"][1].decoded)
+        lines = write(lazy).split("\r\n")
+        self.assertEqual(lines[:3], ["v=0", "o=- 20518 0 IN IP4 203.0.113.1", "s="])
+        self.assertIn("m=audio 54400 RTP/SAVPF 0 96", lines)
+        self.assertEqual(lines[-5:-1], sdp.splitlines()[-4:])
+
+    def test_parse_write_many(self):
+        sdps = []
+        for filename in sorted(os.listdir("tests/sdps")):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdps.append(f.read())
+        results = list(parseMany(sdps, workers=2, chunksize=4))
+        self.assertListEqual(results, [(parse(sdp), None) for sdp in sdps])
+
+        sessions = [session for session, _ in results]
+        sessions.insert(3, {"media": [{}]})
+        results = list(writeMany(sessions, workers=2, chunksize=4))
+        self.assertEqual(len(results), len(sessions))
+        self.assertIsNone(results[3][0])
+        self.assertIsInstance(results[3][1], TypeError)
+        for session, (sdp, error) in zip(sessions[4:], results[4:]):
+            self.assertIsNone(error)
+            self.assertEqual(sdp, write(session))
+
+    def test_bulk_cli(self):
+        sdp = "v=0\r\ns=\xe9\r\n"
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "a.sdp"), "wb") as f:
+                f.write(b"v=0\r\ns=\xff\r\n")
+            path = os.path.join(directory, "b.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(sdp) + '\n"unterminated\n' + json.dumps(sdp) + "\n")
+
+            sources = [source for source, _ in readInputs(path)]
+            self.assertEqual(sources, [path + ":1", path + ":2", path + ":3"])
+            self.assertIsInstance(list(readInputs(path))[1][1], ValueError)
+
+            out = StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main([path, "--workers", "1"]), 1)
+            lines = [json.loads(line) for line in out.getvalue().splitlines()]
+            names = [line["session"]["name"] for line in lines[::2]]
+            self.assertEqual(names, ["é", "é"])
+            self.assertIn("JSONDecodeError", lines[1]["error"])
+
+            os.remove(path)
+            out = StringIO()
+            with redirect_stdout(out):
+                self.assertEqual(main([directory, "--workers", "1"]), 0)
+            self.assertEqual(json.loads(out.getvalue())["session"]["name"], "\udcff")
+
+    def test_parse_compact(self):
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                    sdp_dict = parse(sdp)
+                    compact = parse(sdp, compact=True)
+                    self.assertEqual(compact, sdp_dict)
+                    self.assertEqual(write(compact), write(sdp_dict))
+                    self.assertEqual(pickle.loads(pickle.dumps(compact)), sdp_dict)
+
+        with open("tests/sdps/normal.sdp") as f:
+            candidate = parse(f.read(), compact=True)["media"][0]["candidates"][0]
+        self.assertFalse(hasattr(candidate, "__dict__"))
+        self.assertNotIn("raddr", candidate)
+        self.assertEqual(candidate["ip"], "203.0.113.1")
+        self.assertDictEqual(
+            candidate.toDict(),
+            {
+                "foundation": 0,
+                "component": 1,
+                "protocol": "UDP",
+                "priority": 2113667327,
+                "ip": "203.0.113.1",
+                "port": 54400,
+                "type": "host",
+            },
+        )
+
+    def test_parse_write_bytes(self):
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}", "rb") as f:
+                    data = f.read()
+                    sdp_dict = parse(data.decode())
+                    self.assertDictEqual(parse(data), sdp_dict)
+                    self.assertDictEqual(parse(memoryview(data)), sdp_dict)
+                    self.assertEqual(
+                        write(sdp_dict, asBytes=True), write(sdp_dict).encode()
+                    )
+
+        # a split multi-byte character and a byte that isn't valid UTF-8
+        data = b"v=0\r\ns=caf\xc3\xa9\r\na=label:\xff\r\n"
+        sdp_dict = parse(data)
+        self.assertEqual(sdp_dict["name"], "caf\u00e9")
+        session, *_ = parseIter(data[i : i + 1] for i in range(len(data)))
+        self.assertEqual(session["name"], "caf\u00e9")
+        buffer = bytearray(b"SIP/2.0 200 OK\r\n\r\n")
+        size = writeInto(buffer, sdp_dict)
+        self.assertEqual(size, len(write(sdp_dict, asBytes=True)))
+        self.assertTrue(buffer.endswith(b"s=caf\xc3\xa9\r\na=label:\xff\r\n"))
+
+    def test_parse_editable(self):
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                    sdp_dict = parse(sdp)
+                    session = parseEditable(sdp)
+                    self.assertEqual(write(session), write(sdp_dict))
+                    self.assertDictEqual(session.toDict(), sdp_dict)
+
+        with open("tests/sdps/normal.sdp") as f:
+            sdp = f.read()
+        sdp_dict = parse(sdp)
+        session = parseEditable(sdp)
+        write(session)
+        video = session["media"][1]
+        cached = video.text
+        for s in (session, sdp_dict):
+            s["origin"]["sessionVersion"] = 1
+            s["media"][0]["candidates"][1]["port"] = 9
+            s["media"][0]["candidates"].append({**s["media"][0]["candidates"][0]})
+            del s["media"][0]["ptime"]
+        self.assertIs(video.text, cached)
+        self.assertIsNone(session["media"][0].text)
+        self.assertEqual(write(session), write(sdp_dict))
+        self.assertIs(video.text, cached)
+
+        groups = []
+        session["media"][1].setdefault("ssrcGroups", groups).append(
+            {"semantics": "FID", "ssrcs": "1 2"}
+        )
+        self.assertListEqual(groups, [])
+        sdp_dict["media"][1]["ssrcGroups"] = [{"semantics": "FID", "ssrcs": "1 2"}]
+        self.assertIsNone(video.text)
+        self.assertEqual(write(session), write(sdp_dict))
+
+    def test_diff_apply_patch(self):
+        sessions = []
+        for filename in sorted(os.listdir("tests/sdps")):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sessions.append(parse(f.read()))
+        for old in sessions:
+            for new in sessions:
+                patched = applyPatch(deepcopy(old), diff(old, new))
+                self.assertDictEqual(patched, new)
+                self.assertEqual(write(patched), write(deepcopy(new)))
+
+        with open("tests/sdps/jsep.sdp") as f:
+            old = parse(f.read())
+        new = deepcopy(old)
+        self.assertDictEqual(diff(old, new), {})
+        new["media"][0]["candidates"][1]["port"] = 9
+        del new["media"][0]["ssrcs"][0]
+        new["media"][1]["direction"] = "inactive"
+        self.assertDictEqual(
+            diff(old, new),
+            {
+                "media": {
+                    "change": [
+                        (
+                            ("a1", 0),
+                            {
+                                "lists": {
+                                    "ssrcs": {"remove": [((1732846380, "cname"), 0)]},
+                                    "candidates": {
+                                        "change": [
+                                            (
+                                                ((3348148302, 2), 0),
+                                                new["media"][0]["candidates"][1],
+                                            )
+                                        ]
+                                    },
+                                }
+                            },
+                        ),
+                        (("v1", 0), {"set": {"direction": "inactive"}}),
+                    ],
+                    "byMid": True,
+                }
+            },
+        )
+
+    def test_media_codecs(self):
+        with open("tests/sdps/normal.sdp") as f:
+            video = parse(f.read())["media"][1]
+        codecs = mediaCodecs(video)
+        self.assertListEqual(list(codecs), [97, 98])
+        h264 = codecs[97]
+        self.assertEqual(h264.codec, "H264")
+        self.assertEqual(h264.rate, 90000)
+        self.assertEqual(h264.params["packetization-mode"], 1)
+        self.assertListEqual(h264.rtcpFb, [{"payload": "*", "type": "nack"}])
+        self.assertListEqual(
+            codecs[98].rtcpFb,
+            [
+                {"payload": 98, "type": "nack", "subtype": "rpsi"},
+                {"payload": "*", "type": "nack"},
+            ],
+        )
+        self.assertListEqual(codecs[98].rtcpFbTrrInt, [{"payload": 98, "value": 100}])
+
+        video["fmtp"][0]["config"] = "packetization-mode=0"
+        self.assertEqual(h264.params["packetization-mode"], 0)
+        video["payloads"] = "98 99"
+        video["rtp"].append({"payload": 99, "codec": "rtx", "rate": 90000})
+        video["fmtp"].append({"payload": 99, "config": "apt=98"})
+        self.assertListEqual(list(codecs), [98, 99, 97])
+        self.assertEqual(codecs[99].params, {"apt": 98})
+
+        video["fmtp"][0] = {"payload": 97, "config": "packetization-mode=2"}
+        self.assertEqual(codecs[97].config, "packetization-mode=2")
+        video["rtp"][0]["payload"] = 100
+        self.assertListEqual(list(codecs), [98, 99, 100, 97])
+        self.assertIsNone(codecs[97].rtp)
+        video["rtp"][0]["payload"] = 101
+        self.assertEqual(codecs[101].rtp["payload"], 101)
+
+    def test_media_ssrcs(self):
+        with open("tests/sdps/jsep.sdp") as f:
+            video = parse(f.read())["media"][1]
+        sources = mediaSsrcs(video)
+        self.assertListEqual(list(sources), [1366781083, 1366781084])
+        self.assertEqual(sources[1366781083].cname, "EocUG1f0fcg/yvY7")
+        fid = {"semantics": "FID", "ssrcs": "1366781083 1366781084"}
+        self.assertListEqual(sources[1366781084].groups, [fid])
+
+        video["ssrcs"].append({"id": 1366781085, "attribute": "msid", "value": "a b"})
+        video["ssrcGroups"].append({"semantics": "SIM", "ssrcs": "1366781083 7"})
+        self.assertEqual(len(sources), 4)
+        self.assertEqual(sources[1366781085].msid, "a b")
+        self.assertEqual(len(sources[1366781083].groups), 2)
+        self.assertDictEqual(sources[7].attributes, {})
+
+        video["ssrcs"][0]["value"] = "n3w"
+        self.assertEqual(sources[1366781083].cname, "n3w")
+        video["ssrcs"][0] = {"id": 8, "attribute": "cname", "value": "x"}
+        self.assertEqual(sources[8].cname, "x")
+        self.assertIsNone(sources[1366781083].cname)
+
+    def test_parse_write_candidate(self):
+        with open("tests/sdps/normal.sdp") as f:
+            sdp = f.read()
+        lines = [line for line in sdp.splitlines() if line.startswith("a=candidate")]
+        candidates = parse(sdp)["media"][0]["candidates"]
+        for line, candidate in zip(lines, candidates):
+            self.assertDictEqual(parseCandidate(line), candidate)
+            self.assertDictEqual(parseCandidate(line[2:].encode()), candidate)
+            self.assertEqual("a=" + writeCandidate(candidate), line)
+
+        line = (
+            "candidate:842163049 1 udp 1677729535 198.51.100.7 52010 typ srflx "
+            "raddr 0.0.0.0 rport 0 generation 0 ufrag NbA6 network-cost 999"
+        )
+        candidate = parseCandidate(line)
+        self.assertEqual(candidate["network-cost"], 999)
+        self.assertDictEqual(candidate["extensions"], {"ufrag": "NbA6"})
+        self.assertEqual(
+            writeCandidate(candidate),
+            line.replace(" ufrag NbA6", "") + " ufrag NbA6",
+        )
+        candidate = parseCandidate(line + " x")
+        self.assertDictEqual(candidate["extensions"], {"ufrag": "NbA6", "x": None})
+        self.assertTrue(writeCandidate(candidate).endswith(" ufrag NbA6 x"))
+
+        # a TCP candidate written on its own reads back the same through parse()
+        line = (
+            "candidate:1 1 tcp 1518280447 192.168.150.19 9 typ host tcptype active "
+            "generation 0"
+        )
+        candidate = parseCandidate(line)
+        self.assertEqual(candidate["tcptype"], "active")
+        sdp = "v=0\r\nm=audio 9 TCP 0\r\na=%s\r\n" % writeCandidate(candidate)
+        self.assertDictEqual(parse(sdp)["media"][0]["candidates"][0], candidate)
+        self.assertEqual(writeCandidate(candidate), line)
+        self.assertIn("a=" + writeCandidate(candidate), write(parse(sdp)).splitlines())
+        sdp = sdp.replace("tcptype", "tcpfield")
+        self.assertDictEqual(parse(sdp)["media"][0]["candidates"][0], candidate)
+        legacy = line.replace("tcptype", "tcpfield")
+        self.assertDictEqual(parseCandidate(legacy), candidate)
+        self.assertIsNone(parseCandidate("a=end-of-candidates"))
+        self.assertIsNone(parseCandidate("candidate:1 x udp 1 1.2.3.4 9 typ host"))
+
+    def test_parse_cache(self):
+        cache = ParseCache(maxsize=2)
+        sdps = []
+        for filename in ("normal.sdp", "jsep.sdp", "ssrc.sdp"):
+            with open(f"tests/sdps/{filename}") as f:
+                sdps.append(f.read())
+        first = cache.parse(sdps[0])
+        self.assertDictEqual(first, parse(sdps[0]))
+        self.assertIs(cache.parse(sdps[0].encode()), first)
+        self.assertEqual(write(first), write(parse(sdps[0])))
+        with self.assertRaises(TypeError):
+            first["media"][0]["candidates"].append({})
+        with self.assertRaises(TypeError):
+            first["origin"]["sessionVersion"] = 1
+
+        copy = thaw(first)
+        copy["media"][0]["candidates"].clear()
+        self.assertEqual(deepcopy(first), first)
+        self.assertIs(cache.parse(sdps[0]), first)
+        self.assertEqual(len(first["media"][0]["candidates"]), 4)
+
+        cache.parse(sdps[1])
+        cache.parse(sdps[0])
+        cache.parse(sdps[2])
+        self.assertTupleEqual(tuple(cache.info()), (3, 3, 1, 2, 2))
+        self.assertIsNot(cache.parse(sdps[1]), first)
+        self.assertEqual(cache.info().misses, 4)
+
+    def test_compile_template(self):
+        slots = ["iceUfrag", "icePwd", "fingerprint", "port", "candidates"]
+        filenames = os.listdir("tests/sdps")
+        for filename in filenames:
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                    self.assertEqual(compileTemplate(sdp).render(), write(parse(sdp)))
+                    template = compileTemplate(parse(sdp), slots)
+                    self.assertEqual(template.render(), write(parse(sdp)))
+
+        with open("tests/sdps/jsep.sdp") as f:
+            sdp = f.read()
+        template = compileTemplate(sdp, slots)
+        sdp_dict = parse(sdp)
+        for media in sdp_dict["media"]:
+            media["iceUfrag"] = "4ZcD"
+        sdp_dict["media"][0]["port"] = 50000
+        candidates = sdp_dict["media"][0]["candidates"][:1]
+        sdp_dict["media"][0]["candidates"] = candidates
+        rendered = template.render(
+            {"iceUfrag": "4ZcD", "media": [{"port": 50000, "candidates": candidates}]},
+            asBytes=True,
+        )
+        self.assertEqual(rendered, write(sdp_dict, asBytes=True))
+
+    def test_stats(self):
+        with open("tests/sdps/normal.sdp") as f:
+            sdp = f.read()
+        stats = Stats()
+        session = parse(sdp, stats=stats)
+        self.assertEqual(session, parse(sdp))
+        lines = [line for line in sdp.splitlines() if line]
+        self.assertEqual(sum(stats.lines.values()), len(lines))
+        self.assertEqual(stats.lines["m"], 2)
+        self.assertEqual(stats.rules["m=media"].matches, 2)
+        self.assertEqual(stats.rules["a=rtp"].matches, 4)
+        self.assertEqual(stats.rules["a=candidates"].matches, 8)
+
+        sdp = "v=0\r\nm=audio 1 RTP/AVP 0\r\na=x-unknown:1\r\nk=bogus\r\n"
+        stats.clear()
+        parse(sdp, stats=stats)
+        self.assertEqual(stats.rules["a=invalid"].matches, 1)
+        self.assertEqual(stats.unmatched, {"k": 1})
+        self.assertGreater(sum(r.failures for r in stats.rules.values()), 0)
+
+        stats.clear()
+        self.assertEqual(write(session, stats=stats), write(session))
+        self.assertEqual(stats.writes["m=media"].matches, 2)
+        self.assertEqual(stats.writes["a=rtp"].matches, 4)
+        self.assertEqual(
+            list(stats.toDict()), ["lines", "unmatched", "rules", "writes"]
+        )
+
+    def test_intern(self):
+        with open("tests/sdps/normal.sdp") as f:
+            sdp = f.read()
+        a, b = parse(sdp), parse(sdp)
+        rtpA, rtpB = a["media"][0]["rtp"][1], b["media"][0]["rtp"][1]
+        self.assertIs(rtpA["codec"], rtpB["codec"])
+        self.assertIs(a["media"][0]["protocol"], b["media"][0]["protocol"])
+        self.assertIs(a["media"][0]["direction"], b["media"][0]["direction"])
+        self.assertIsNot(a["iceUfrag"], b["iceUfrag"])
+        fmtpA, fmtpB = a["media"][1]["fmtp"][0], b["media"][1]["fmtp"][0]
+        self.assertIsNot(fmtpA["config"], fmtpB["config"])
+        a, b = parse(sdp, intern=False), parse(sdp, intern=False)
+        self.assertIsNot(a["media"][0]["protocol"], b["media"][0]["protocol"])
+        self.assertEqual(a, parse(sdp))
+
+        rule = next(obj for obj in grammar["a"] if obj.get("name") == "iceUfrag")
+        self.assertNotIn("intern", rule)
+        rule["intern"] = ["iceUfrag"]
+        try:
+            a, b = parse(sdp), parse(sdp)
+            self.assertIs(a["iceUfrag"], b["iceUfrag"])
+        finally:
+            del rule["intern"]
+
+    def test_parse_fields(self):
+        fields = {"fingerprint", "setup", "mid", "candidates", "invalid"}
+        mLine = {"type", "port", "protocol", "payloads", "rtp", "fmtp"}
+        for filename in os.listdir("tests/sdps"):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    sdp = f.read()
+                full = parse(sdp)
+                projected = parse(sdp, fields=fields)
+                self.assertEqual(
+                    {k: v for k, v in projected.items() if k != "media"},
+                    {k: v for k, v in full.items() if k in fields},
+                )
+                for got, media in zip(projected["media"], full["media"]):
+                    expected = {k: v for k, v in media.items() if k in fields | mLine}
+                    expected["rtp"] = expected["fmtp"] = []
+                    self.assertEqual(got, expected)
+        with self.assertRaises(ValueError):
+            parse(sdp, fields=fields, stats=Stats())
+
+    def test_scan_file(self):
+        headers = b"INVITE sip:bob@example.com SIP/2.0\r\nVia: SIP/2.0/UDP h\r\n\r\n"
+        expected = []
+        with tempfile.NamedTemporaryFile(suffix=".log") as f:
+            offset = 0
+            for filename in sorted(os.listdir("tests/sdps")) * 3:
+                if filename.endswith("sdp"):
+                    with open(f"tests/sdps/{filename}", "rb") as sdp:
+                        body = sdp.read().rstrip(b"\r\n") + b"\r\n"
+                    if len(expected) % 2:
+                        body = body.replace(b"\r\n", b"\n")
+                    else:
+                        f.write(headers)
+                        offset += len(headers)
+                    expected.append((offset, parse(body)))
+                    f.write(body)
+                    offset += len(body)
+            f.flush()
+            self.assertEqual(list(scanFile(f.name)), expected)
+            self.assertEqual(
+                list(scanFile(f.name, workers=2, regionSize=4099)), expected
+            )
+
+    def test_write_does_not_mutate(self):
+        session = {"media": [{"type": "audio", "port": 9, "protocol": "RTP/AVP"}]}
+        self.assertEqual(write(session), "v=0\r\ns= \r\nm=audio 9 RTP/AVP \r\n")
+        self.assertNotIn("version", session)
+        self.assertNotIn("payloads", session["media"][0])
+        self.assertEqual(write(freeze(session)), write(session))
+
+    def test_evolve_replace(self):
+        with open("tests/sdps/jsep.sdp") as f:
+            session = freeze(parse(f.read()))
+        changed = replace(session, ("media", 1, "direction"), "recvonly")
+        self.assertEqual(changed["media"][1]["direction"], "recvonly")
+        self.assertEqual(session["media"][1]["direction"], "sendrecv")
+        self.assertIs(changed["media"][0], session["media"][0])
+        self.assertIs(changed["media"][1]["rtp"], session["media"][1]["rtp"])
+        self.assertIs(changed["origin"], session["origin"])
+        with self.assertRaises(TypeError):
+            changed["media"][1]["direction"] = "inactive"
+
+        candidate = parseCandidate("candidate:9 1 udp 2113937151 192.0.2.9 9 typ host")
+        added = evolve(session, ("media", 0, "candidates"), lambda c: c + [candidate])
+        self.assertEqual(added["media"][0]["candidates"][-1], candidate)
+        self.assertIs(
+            added["media"][0]["candidates"][0], session["media"][0]["candidates"][0]
+        )
+        self.assertEqual(thaw(added["media"][1]), thaw(session["media"][1]))
+        self.assertIn("a=candidate:9 1 udp", write(added))
+
+    def test_mid_index(self):
+        with open("tests/sdps/jsep.sdp") as f:
+            sdp = f.read()
+        session, mids = parseIndexed(sdp)
+        self.assertEqual(session, parse(sdp))
+        self.assertEqual(list(mids), ["a1", "v1"])
+        self.assertIs(mids["v1"], session["media"][1])
+        self.assertEqual(mids.position("v1"), 1)
+        self.assertIs(mids.group("v1"), session["groups"][0])
+        self.assertIs(mids.bundleOwner("v1"), session["media"][0])
+        self.assertIsNone(mids.group("v1", "LS"))
+
+        data = {"type": "application", "port": 9, "protocol": "UDP/DTLS/SCTP"}
+        session["media"].append(dict(data, mid=2))
+        session["groups"][0]["mids"] += " 2"
+        self.assertEqual(mids.position(2), 2)
+        self.assertIs(mids.bundleOwner(2), session["media"][0])
+        del session["media"][0]
+        self.assertIsNone(mids.get("a1"))
+        self.assertIs(mids["v1"], session["media"][0])
+        session["media"][0]["mid"] = "v2"
+        self.assertNotIn("v1", mids)
+        self.assertIs(sessionMids(session)["v2"], session["media"][0])
+
+        # same number of sections, same list, group edited in place
+        session, mids = parseIndexed(sdp)
+        del session["media"][0]
+        session["media"].append(dict(data, mid="x"))
+        session["groups"][0]["mids"] = "v1 x"
+        self.assertIs(mids.get("x"), session["media"][1])
+        self.assertEqual(list(mids), ["v1", "x"])
+        self.assertIs(mids.group("x"), session["groups"][0])
+        self.assertIs(mids.bundleOwner("x"), session["media"][0])
+        session, mids = parseIndexed(sdp)
+        session["media"][1] = dict(data, mid="y")
+        self.assertEqual(len(mids), 2)
+        self.assertEqual(mids.position("y"), 1)
+
+    def test_declared_types_match_to_int_if_int(self):
+        lines = ["v=", "t= 0", "m=audio  RTP/AVP", "a=rtpmap: x/"]
+        for filename in os.listdir("tests/sdps"):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    lines.extend(f.read().splitlines())
+        for line in lines:
+            for obj in grammar.get(line[:1], []):
+                match = obj["reg"].match(line[2:])
+                if not match:
+                    continue
+                for converter, value in zip(obj["convert"], match.groups()):
+                    if value is None:
+                        continue
+                    expected = toIntIfInt(value)
+                    got = value if converter is None else converter(value)
+                    self.assertIs(type(got), type(expected), line)
+                    self.assertEqual(got, expected, line)
+
+    def test_to_json(self):
+        for filename in os.listdir("tests/sdps"):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}", "rb") as f:
+                    sdp = f.read()
+                text = json.dumps(parse(sdp))
+                self.assertEqual(toJson(sdp), text, filename)
+                self.assertEqual(toJson(sdp, asBytes=True), text.encode(), filename)
+                self.assertEqual(fromJson(text), write(parse(sdp)), filename)
+        self.assertEqual(toJson("a=x\r\nk=y"), json.dumps(parse("a=x\r\nk=y")))
+
+    def test_rewriter(self):
+        with open("tests/sdps/normal.sdp", "rb") as f:
+            sdp = f.read()
+        rewriter = Rewriter()
+        rewriter.on("a=candidates", lambda c, media: c if c["type"] == "host" else None)
+        rewriter.on("c=connection", lambda c, media: dict(c, ip="198.51.100.7"))
+        rewriter.on("a=ptime", lambda p, media: p)
+        out = rewriter.rewrite(sdp, asBytes=True)
+
+        expected = parse(sdp)
+        expected["connection"]["ip"] = "198.51.100.7"
+        for media in expected["media"]:
+            media["candidates"] = [
+                c for c in media["candidates"] if c["type"] == "host"
+            ]
+        self.assertEqual(parse(out), expected)
+        kept = [
+            line
+            for line in sdp.splitlines(True)
+            if not line.startswith((b"c=", b"a=candidate"))
+        ]
+        self.assertEqual([line for line in out.splitlines(True) if line in kept], kept)
+        self.assertIn(b"c=IN IP4 198.51.100.7\r\n", out)
+        self.assertEqual(Rewriter().rewrite(sdp, asBytes=True), sdp)
+        with self.assertRaises(ValueError):
+            rewriter.on("a=nothing", lambda fields, media: fields)
+
+    def test_memoized_params(self):
+        config = "profile-level-id=42e01f;level-asymmetry-allowed=1"
+        params = parseParams(config)
+        self.assertIs(parseParams(config), params)
+        self.assertEqual(
+            params, {"profile-level-id": "42e01f", "level-asymmetry-allowed": 1}
+        )
+        with self.assertRaises(TypeError):
+            params["x"] = 1
+        attrs = parseImageAttributes("[x=1280,y=720] [x=320,y=180]")
+        self.assertIs(parseImageAttributes("[x=1280,y=720] [x=320,y=180]"), attrs)
+        with self.assertRaises(TypeError):
+            attrs[0]["x"] = 640
+
+        values = ["", "0", "-7", "+7", " 7", "7\n", "1_000", "1.5", ".5", "5.", "1e5"]
+        values += ["1E-2", "e5", "1e", "inf", "-Infinity", "NaN", "0x10", "42e01f"]
+        values += ["VP8", "\u0663", "\u00b2", "1" * 700]
+        for value in values:
+            expected = convertNumber(value)
+            self.assertIs(type(toIntIfInt(value)), type(expected), value)
+            if expected == expected:
+                self.assertEqual(toIntIfInt(value), expected, value)
+
     def test_parse_params_fmtp(self):
         with open("tests/sdps/normal.sdp") as f:
             sdp = f.read()
@@ -102,6 +753,31 @@ class TestMethods(unittest.TestCase):
                 "video simulcast recv streams",
             )
 
+    def test_rule_index_matches_linear_scan(self):
+        lines = ["a=rtcp-mux-only", "a=rtcp-fb:96 trr-int 5", "a=simulcast: recv pt=97"]
+        for filename in os.listdir("tests/sdps"):
+            if filename.endswith("sdp"):
+                with open(f"tests/sdps/{filename}") as f:
+                    lines.extend(f.read().splitlines())
+        for line in lines:
+            if len(line) < 2 or line[1] != "=" or line[0] not in grammar:
+                continue
+            content = line[2:]
+            expected = next(
+                (obj for obj in grammar[line[0]] if obj["reg"].match(content)), None
+            )
+            index, fallback = compiledGrammar[line[0]]
+            candidates = index.get(content.partition(":")[0], fallback)
+            found = next(
+                (
+                    obj
+                    for prefix, obj in candidates
+                    if content.startswith(prefix) and obj["reg"].match(content)
+                ),
+                None,
+            )
+            self.assertIs(found, expected, line)
+
 
 if __name__ == "__main__":
     unittest.main()